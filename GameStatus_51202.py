@@ -1,28 +1,173 @@
 import numpy as np
 import logging
+from transposition import hash_board, piece_key, zobrist_keys
+from board_geometry import geometry
+
+BATCH_ORDERING_MIN_SIZE = 6 #below this the per-cell loop in get_moves() is faster than the NumPy batch
+
+def window_scores(O_count, X_count, O_weight, X_weight):#vectorized window_score() over NumPy arrays
+    O_score = np.where((X_count == 0) & (O_count > 0), O_weight * O_weight + np.where(O_count == 2, O_weight * 10, 0), 0)
+    X_score = np.where((O_count == 0) & (X_count > 0), X_weight * X_weight + np.where(X_count == 2, X_weight * 10, 0), 0)
+    return O_score - X_score
+
+def window_score(O_count, X_count, O_weight, X_weight):#score of one triplet window, same rules as evaluate_line()
+    score = 0
+    if X_count == 0 and O_count > 0:
+        score += O_weight ** 2
+        if O_count == 2:
+            score += O_weight * 10
+    elif O_count == 0 and X_count > 0:
+        score -= X_weight ** 2
+        if X_count == 2:
+            score -= X_weight * 10
+    return score
 
 class GameStatus:
-    def __init__(self, board_state, turn_O):#initialize game state
+    #slots instead of a per-instance dict, the search creates and mutates many of these
+    __slots__ = ('board_state', 'turn_O', 'winner', '_zobrist_hash', '_windows', '_score', '_triplets', '_threats', '_empty_count', '_symmetry_hashes',
+                 'frontier_radius', 'max_moves', '_frontier_bits', '_occupied_bits', '_frontier_stack')
+
+    def __init__(self, board_state, turn_O, zobrist_hash=None):#initialize game state
         self.board_state = board_state
         self.turn_O = turn_O  # True if it's O's turn
         self.winner = None
+        self._zobrist_hash = zobrist_hash
+        self._windows = None #per-window (O count, X count, O weight, X weight), built on first evaluation
+        self._score = None #running evaluate_board() total matching _windows
+        self._triplets = None #(O triplets, X triplets) matching _windows
+        self._threats = None #(O, X) bitmasks of the window ids holding two of that symbol and no other, matching _windows
+        self._empty_count = None #number of empty cells, counted on first use
+        self._symmetry_hashes = None #zobrist hash of the board under each symmetry, built on first use
+        #optional move generation limits, see set_move_generation(); children inherit them
+        self.frontier_radius = None
+        self.max_moves = None
+        self._frontier_bits = None #empty cells within frontier_radius of a stone, bit = flat index
+        self._occupied_bits = None
+        self._frontier_stack = [] #(occupied, frontier) before each make_move(), popped by unmake_move()
+
+    @property
+    def zobrist_hash(self):#zobrist hash of the position, computed on first use if not inherited from the parent
+        if self._zobrist_hash is None:
+            self._zobrist_hash = hash_board(self.board_state, self.turn_O)
+        return self._zobrist_hash
+
+    @property
+    def grid_size(self):#number of rows (and columns) of the board
+        return self.board_state.shape[0]
+
+    @property
+    def empty_count(self):#number of empty cells, kept up to date by get_new_state() and make_move()
+        if self._empty_count is None:
+            self._empty_count = int(np.count_nonzero(self.board_state == 0))
+        return self._empty_count
+
+    @property
+    def symmetry_hashes(self):#zobrist hash of the board under each of the 8 symmetries (identity first)
+        if self._symmetry_hashes is None:
+            size = self.grid_size
+            flat = self.board_state.ravel()
+            self._symmetry_hashes = tuple(hash_board(flat[perm].reshape(size, size), self.turn_O) for perm in geometry(size).symmetries)
+        return self._symmetry_hashes
+
+    def _symmetry_hashes_after(self, move, symbol):#symmetry_hashes of the child, xoring in the placed cell under each symmetry
+        size = self.grid_size
+        orbit = geometry(size).cell_orbits[move[0] * size + move[1]]
+        cell_keys, side_key = zobrist_keys(size)
+        piece = 0 if symbol == 1 else 1
+        return tuple(h ^ cell_keys[idx][piece] ^ side_key for h, idx in zip(self.symmetry_hashes, orbit))
+
+    def canonical_key(self):#return (hash shared by all 8 orientations of this position, symmetry mapping it to the canonical one)
+        hashes = self.symmetry_hashes
+        key = min(hashes)
+        return key, hashes.index(key)
+
+    def to_canonical(self, move, t):#move in real coordinates -> coordinates in the canonical orientation t
+        size = self.grid_size
+        return divmod(geometry(size).cell_orbits[move[0] * size + move[1]][t], size)
+
+    def from_canonical(self, move, t):#move in the canonical orientation t -> real coordinates
+        size = self.grid_size
+        return divmod(int(geometry(size).symmetries[t][move[0] * size + move[1]]), size)
+
+    def set_move_generation(self, frontier_radius=None, max_moves=None):
+        """
+        Limit get_moves() to empty cells within frontier_radius rows/columns of a stone (all empty cells while
+        there are none) and/or to the max_moves best-ordered cells. None turns a limit off.
+        """
+        self.frontier_radius = frontier_radius
+        self.max_moves = max_moves
+        self._frontier_bits = None
+        self._occupied_bits = None
+
+    def _init_frontier(self):#build the frontier from scratch, afterwards get_new_state() keeps it up to date
+        masks = geometry(self.grid_size).neighborhood_masks(self.frontier_radius)
+        occupied = 0
+        frontier = 0
+        for idx in np.flatnonzero(self.board_state.ravel() != 0):
+            occupied |= 1 << int(idx)
+            frontier |= masks[idx]
+        self._occupied_bits = occupied
+        self._frontier_bits = frontier & ~occupied
+
+    def candidate_cells(self):#flat indices of the empty cells get_moves() considers, ascending
+        if self.frontier_radius is not None:
+            if self._frontier_bits is None:
+                self._init_frontier()
+            bits = self._frontier_bits
+            if bits:
+                cells = []
+                while bits:
+                    low = bits & -bits
+                    cells.append(low.bit_length() - 1)
+                    bits ^= low
+                return np.array(cells)
+        #no limit, no stones yet, or every empty cell is out of reach of the stones
+        return np.flatnonzero(self.board_state.ravel() == 0)
+
+    def _limit_moves(self, moves):#one move per symmetry class, capped at max_moves
+        moves = self.unique_moves(moves)
+        if self.max_moves is not None:
+            moves = moves[:self.max_moves]
+        return moves
 
-    def is_terminal(self):#check if game is over
-        size = self.board_state.shape[0]
+    def unique_moves(self, moves):#drop moves that are mirror images of an earlier move on a symmetric board
+        hashes = self.symmetry_hashes
+        stabilizer = [t for t in range(1, len(hashes)) if hashes[t] == hashes[0]]
+        if not stabilizer:
+            return moves
+        size = self.grid_size
+        orbits = geometry(size).cell_orbits
+        seen = set()
+        unique = []
+        for move in moves:
+            idx = move[0] * size + move[1]
+            if idx in seen:
+                continue
+            unique.append(move)
+            seen.add(idx)
+            seen.update(orbits[idx][t] for t in stabilizer)
+        return unique
+
+    def is_terminal(self):#check if game is over, from the incrementally kept empty cell and triplet counts
+        if self.winner is not None:#already decided for this position
+            return True
+        size = self.grid_size
         if size == 3: # check 3x3 grid for winner
-            winner = self.check_winner()
-            if winner:
-                self.winner = winner
+            O_triplets, X_triplets = self.triplet_counts()
+            if O_triplets:
+                self.winner = 'O'
+                return True
+            elif X_triplets:
+                self.winner = 'X'
                 return True
-            elif not np.any(self.board_state == 0): #if board is full
+            elif self.empty_count == 0: #if board is full
                 self.winner = 'Draw'
                 return True
             else:
                 return False
         else: #for larger grids, only end game when board full
-            if not np.any(self.board_state == 0): #if board full
-                O_triplets = self.count_triplets(1) #count triplets of O
-                X_triplets = self.count_triplets(-1) #count triplets of X
+            if self.empty_count == 0: #if board full
+                O_triplets, X_triplets = self.triplet_counts()
 
                 if O_triplets > X_triplets:
                     self.winner = 'O'  # 'O' wins
@@ -127,114 +272,299 @@ class GameStatus:
         return score
     
     def count_triplets(self, symbol):#count triplets of a symbol
-        board = self.board_state
-        size = board.shape[0]
-        triplet_count = 0
-
-        #check rows and columns for triplets
-        for i in range(size):
-            for j in range(size - 2): #ensure check for 3 consecutive cells
-                if np.all(board[i, j:j + 3] == symbol): #horizontal triplet
-                    triplet_count += 1
-                if np.all(board[j:j + 3, i] == symbol): #vertical triplet
-                    triplet_count += 1
-
-        #check diagonals for triplets
-        for i in range(size - 2):
-            for j in range(size - 2):
-                if np.all([board[i + k, j + k] == symbol for k in range(3)]): #main diagonal triplet
-                    triplet_count += 1
-                if np.all([board[i + 2 - k, j + k] == symbol for k in range(3)]): #anti-diagonal triplet
-                    triplet_count += 1
-
-        return triplet_count
+        O_triplets, X_triplets = self.triplet_counts()
+        return O_triplets if symbol == 1 else X_triplets
+
+    def triplet_counts(self):#return (O triplets, X triplets), kept up to date with the triplet windows
+        if self._windows is None:
+            self._init_windows()
+        return self._triplets
+
+    def threat_cells(self, symbol):#ascending flat indices of the empty cells where symbol would complete a triplet
+        if self._windows is None:
+            self._init_windows()
+        bits = self._threats[0 if symbol == 1 else 1]
+        if not bits:
+            return []
+        windows = geometry(self.board_state.shape[0]).windows
+        cells = self.board_state.ravel()
+        found = set()
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            found.update(idx for idx in windows[low.bit_length() - 1] if cells[idx] == 0)
+        return sorted(found)
+
+    def threat_making_cells(self, symbol):#ascending flat indices of the empty cells where symbol would make a new two-in-a-window threat
+        if self._windows is None:
+            self._init_windows()
+        own = 0 if symbol == 1 else 1
+        windows = geometry(self.board_state.shape[0]).windows
+        cells = self.board_state.ravel()
+        found = set()
+        for window, counts in zip(windows, self._windows):
+            if counts[own] == 1 and counts[1 - own] == 0:
+                found.update(idx for idx in window if cells[idx] == 0)
+        return sorted(found)
 
     def get_moves(self):#get all possible moves
         moves = []
         size = self.board_state.shape[0]
-        # get all empty positions
-        empty_positions = np.argwhere(self.board_state == 0)
+        if size >= BATCH_ORDERING_MIN_SIZE:
+            return self._limit_moves(self._get_moves_batched())
+        # get the empty positions to consider
+        empty_positions = self.candidate_cells()
 
-        # evaluate moves and sort them
+        # evaluate moves and sort them, scoring each child from the windows through its cell only
+        symbol = 1 if self.turn_O else -1
         move_scores = []
-        for pos in empty_positions:
-            x, y = pos
-            temp_board = np.copy(self.board_state)
-            temp_board[x, y] = 1 if self.turn_O else -1
-            temp_state = GameStatus(temp_board, not self.turn_O)
-            score = temp_state.evaluate_board()
+        for idx in empty_positions:
+            x, y = divmod(int(idx), size)
+            score = self.score_after_move((x, y), symbol)
             move_scores.append((score, (x, y)))
 
         #sort moves by score in descending order
         move_scores.sort(reverse=self.turn_O)  #maximize if 'O's turn, minimize if 'X's turn
 
-        #extract sorted moves
+        #extract sorted moves, one per symmetry class
         moves = [move for score, move in move_scores]
-        return moves
+        return self._limit_moves(moves)
+
+    def _get_moves_batched(self):#get_moves() scoring every candidate in one vectorized pass
+        if self._windows is None:
+            self._init_windows()
+        size = self.board_state.shape[0]
+        geo = geometry(size)
+        empty = self.candidate_cells()
+
+        #(candidates, windows through the cell, O count / X count / O weight / X weight)
+        window_ids = geo.cell_window_array[empty]
+        counts = np.array(self._windows + [(0, 0, 0, 0)])[window_ids]
+        O_count, X_count, O_weight, X_weight = counts[..., 0], counts[..., 1], counts[..., 2], counts[..., 3]
+        weight = geo.weights.ravel()[empty][:, None]
+        before = window_scores(O_count, X_count, O_weight, X_weight)
+        if self.turn_O:
+            after = window_scores(O_count + 1, X_count, O_weight + weight, X_weight)
+        else:
+            after = window_scores(O_count, X_count + 1, O_weight, X_weight + weight)
+        real = window_ids < len(self._windows) #ignore the dummy padding windows
+        scores = self._score + ((after - before) * real).sum(axis=1)
+
+        #same order as sorting (score, move) tuples: descending for 'O', ascending for 'X'
+        if self.turn_O:
+            order = np.lexsort((-empty, -scores))
+        else:
+            order = np.lexsort((empty, scores))
+        return [divmod(int(idx), size) for idx in empty[order]]
 
     def get_new_state(self, move):#get new game state after a move
         new_board_state = np.copy(self.board_state)
         x, y = move
-        new_board_state[x, y] = 1 if self.turn_O else -1
-        return GameStatus(new_board_state, not self.turn_O)
-    
-    def generate_weights(self, size):
-        #create coordinate grids
-        x = np.arange(size)
-        y = np.arange(size)
-        xv, yv = np.meshgrid(x, y)
-        
-        #calculate distances from the center
-        center = (size - 1) / 2
-        distances = np.sqrt((xv - center) ** 2 + (yv - center) ** 2)
-        
-        #invert distances to get weights (closer to center = higher weight)
-        max_distance = np.max(distances)
-        weights = (max_distance - distances) + 1  #add 1 to ensure weights are positive
-        
-        #normalize weights to have integers
-        weights = weights.astype(int)
-
-        return weights
-    
-    def evaluate_board(self):#evaluate board state
-        board = self.board_state
-        size = board.shape[0]
-        score = 0
-
-        #generate positional weights
-        weights = self.generate_weights(size)
-
-        #apply weights to the board
-        weighted_board = board * weights
-
-        #evaluate lines
-        lines = []
-
-        #rows
-        for i in range(size):
-            for j in range(size - 2):
-                line = weighted_board[i, j:j + 3]
-                lines.append(line)
+        symbol = 1 if self.turn_O else -1
+        new_board_state[x, y] = symbol
+        #update the hash incrementally instead of rehashing the whole board
+        new_hash = self.zobrist_hash ^ piece_key(new_board_state.shape[0], move, symbol)
+        new_state = GameStatus(new_board_state, not self.turn_O, new_hash)
+        if self._windows is not None:#carry the evaluation over, touching only the windows through the placed cell
+            new_state._windows, new_state._score, new_state._triplets, new_state._threats = self._updated_windows(move, symbol)
+        if self._empty_count is not None:
+            new_state._empty_count = self._empty_count - 1
+        if self._symmetry_hashes is not None:
+            new_state._symmetry_hashes = self._symmetry_hashes_after(move, symbol)
+        if self.frontier_radius is not None or self.max_moves is not None:
+            new_state.frontier_radius = self.frontier_radius
+            new_state.max_moves = self.max_moves
+            if self._frontier_bits is not None:
+                new_state._occupied_bits, new_state._frontier_bits = self._frontier_after(x * new_board_state.shape[0] + y)
+        return new_state
+
+    def copy(self):#independent copy with the same cached hashes and evaluation, e.g. for a search in another thread
+        new_state = GameStatus(np.copy(self.board_state), self.turn_O, self._zobrist_hash)
+        if self._windows is not None:
+            new_state._windows, new_state._score, new_state._triplets = list(self._windows), self._score, self._triplets
+            new_state._threats = self._threats
+        new_state._empty_count = self._empty_count
+        new_state._symmetry_hashes = self._symmetry_hashes
+        new_state.frontier_radius, new_state.max_moves = self.frontier_radius, self.max_moves
+        new_state._occupied_bits, new_state._frontier_bits = self._occupied_bits, self._frontier_bits
+        return new_state
+
+    def _frontier_after(self, idx):#(occupied, frontier) bits after a stone is placed on cell idx
+        occupied = self._occupied_bits | (1 << idx)
+        frontier = (self._frontier_bits | geometry(self.grid_size).neighborhood_masks(self.frontier_radius)[idx]) & ~occupied
+        return occupied, frontier
+
+    def make_move(self, move):#place the side to move's symbol in place, the allocation-free alternative to get_new_state()
+        x, y = move
+        size = self.board_state.shape[0]
+        symbol = 1 if self.turn_O else -1
+        #hashes first, they may still be built lazily from the board as it was before the move
+        self._zobrist_hash = self.zobrist_hash ^ piece_key(size, move, symbol)
+        if self._symmetry_hashes is not None:
+            self._symmetry_hashes = self._symmetry_hashes_after(move, symbol)
+        self.board_state[x, y] = symbol
+        if self._windows is not None:
+            self._shift_windows(x * size + y, symbol, 1)
+        if self._empty_count is not None:
+            self._empty_count -= 1
+        if self._frontier_bits is not None:
+            self._frontier_stack.append((self._occupied_bits, self._frontier_bits))
+            self._occupied_bits, self._frontier_bits = self._frontier_after(x * size + y)
+        self.turn_O = not self.turn_O
+        self.winner = None
 
-        #columns
-        for j in range(size):
-            for i in range(size - 2):
-                line = weighted_board[i:i + 3, j]
-                lines.append(line)
+    def unmake_move(self, move):#undo make_move()
+        x, y = move
+        size = self.board_state.shape[0]
+        self.turn_O = not self.turn_O
+        self.winner = None
+        symbol = 1 if self.turn_O else -1
+        self.board_state[x, y] = 0
+        self._zobrist_hash ^= piece_key(size, move, symbol)
+        if self._symmetry_hashes is not None:
+            self._symmetry_hashes = self._symmetry_hashes_after(move, symbol) #xor is its own inverse
+        if self._windows is not None:
+            self._shift_windows(x * size + y, symbol, -1)
+        if self._empty_count is not None:
+            self._empty_count += 1
+        if self._frontier_bits is not None:
+            if self._frontier_stack:
+                self._occupied_bits, self._frontier_bits = self._frontier_stack.pop()
+            else:#the frontier was first built after this move was made, rebuild it lazily
+                self._occupied_bits = self._frontier_bits = None
+
+    def _init_windows(self):#count symbols and weights of every triplet window from scratch
+        geo = geometry(self.board_state.shape[0])
+        windows, weights = geo.windows, geo.flat_weights
+        cells = self.board_state.ravel().tolist()
+        self._windows = []
+        self._score = 0
+        O_triplets = X_triplets = 0
+        O_threats = X_threats = 0
+        for w, window in enumerate(windows):
+            O_count = X_count = O_weight = X_weight = 0
+            for idx in window:
+                if cells[idx] == 1:
+                    O_count += 1
+                    O_weight += weights[idx]
+                elif cells[idx] == -1:
+                    X_count += 1
+                    X_weight += weights[idx]
+            self._windows.append((O_count, X_count, O_weight, X_weight))
+            self._score += window_score(O_count, X_count, O_weight, X_weight)
+            O_triplets += O_count == 3
+            X_triplets += X_count == 3
+            if O_count == 2 and X_count == 0:
+                O_threats |= 1 << w
+            elif X_count == 2 and O_count == 0:
+                X_threats |= 1 << w
+        self._triplets = (O_triplets, X_triplets)
+        self._threats = (O_threats, X_threats)
+
+    def _updated_windows(self, move, symbol):#return (windows, score, triplets, threats) after symbol is placed at move
+        size = self.board_state.shape[0]
+        geo = geometry(size)
+        cell_windows, weights = geo.cell_windows, geo.flat_weights
+        idx = move[0] * size + move[1]
+        weight = weights[idx]
+        new_windows = list(self._windows)
+        score = self._score
+        completed = 0 #windows the placed symbol turns into triplets
+        O_threats, X_threats = self._threats
+        for w in cell_windows[idx]:
+            O_count, X_count, O_weight, X_weight = new_windows[w]
+            score -= window_score(O_count, X_count, O_weight, X_weight)
+            #xor the window out of the threat index before the change and back in after it if it still is a threat
+            if O_count == 2 and X_count == 0:
+                O_threats ^= 1 << w
+            elif X_count == 2 and O_count == 0:
+                X_threats ^= 1 << w
+            if symbol == 1:
+                O_count += 1
+                O_weight += weight
+                completed += O_count == 3
+            else:
+                X_count += 1
+                X_weight += weight
+                completed += X_count == 3
+            new_windows[w] = (O_count, X_count, O_weight, X_weight)
+            score += window_score(O_count, X_count, O_weight, X_weight)
+            if O_count == 2 and X_count == 0:
+                O_threats ^= 1 << w
+            elif X_count == 2 and O_count == 0:
+                X_threats ^= 1 << w
+        O_triplets, X_triplets = self._triplets
+        if symbol == 1:
+            return new_windows, score, (O_triplets + completed, X_triplets), (O_threats, X_threats)
+        return new_windows, score, (O_triplets, X_triplets + completed), (O_threats, X_threats)
+
+    def _shift_windows(self, idx, symbol, step):#add (step=1) or remove (step=-1) symbol on cell idx in _windows, _score, _triplets and _threats
+        geo = geometry(self.board_state.shape[0])
+        weight = geo.flat_weights[idx] * step
+        windows = self._windows
+        score = self._score
+        completed = 0 #triplets made (step=1) or broken (step=-1)
+        O_threats, X_threats = self._threats
+        for w in geo.cell_windows[idx]:
+            O_count, X_count, O_weight, X_weight = windows[w]
+            score -= window_score(O_count, X_count, O_weight, X_weight)
+            if O_count == 2 and X_count == 0:
+                O_threats ^= 1 << w
+            elif X_count == 2 and O_count == 0:
+                X_threats ^= 1 << w
+            if symbol == 1:
+                completed += O_count == 3
+                O_count += step
+                O_weight += weight
+                completed += O_count == 3
+            else:
+                completed += X_count == 3
+                X_count += step
+                X_weight += weight
+                completed += X_count == 3
+            windows[w] = (O_count, X_count, O_weight, X_weight)
+            score += window_score(O_count, X_count, O_weight, X_weight)
+            if O_count == 2 and X_count == 0:
+                O_threats ^= 1 << w
+            elif X_count == 2 and O_count == 0:
+                X_threats ^= 1 << w
+        self._score = score
+        self._threats = (O_threats, X_threats)
+        O_triplets, X_triplets = self._triplets
+        if symbol == 1:
+            self._triplets = (O_triplets + completed * step, X_triplets)
+        else:
+            self._triplets = (O_triplets, X_triplets + completed * step)
 
-        #diagonals
-        for i in range(size - 2):
-            for j in range(size - 2):
-                diag = np.array([weighted_board[i + k, j + k] for k in range(3)])
-                lines.append(diag)
-                anti_diag = np.array([weighted_board[i + 2 - k, j + k] for k in range(3)])
-                lines.append(anti_diag)
+    def score_after_move(self, move, symbol):#evaluate_board() of the child position without building it
+        if self._windows is None:
+            self._init_windows()
+        size = self.board_state.shape[0]
+        geo = geometry(size)
+        cell_windows, weights = geo.cell_windows, geo.flat_weights
+        idx = move[0] * size + move[1]
+        weight = weights[idx]
+        score = self._score
+        for w in cell_windows[idx]:
+            O_count, X_count, O_weight, X_weight = self._windows[w]
+            score -= window_score(O_count, X_count, O_weight, X_weight)
+            if symbol == 1:
+                score += window_score(O_count + 1, X_count, O_weight + weight, X_weight)
+            else:
+                score += window_score(O_count, X_count + 1, O_weight, X_weight + weight)
+        return score
 
-        for line in lines:
-            score += self.evaluate_line(line)
+    def is_empty(self, move):#True if move is a free cell on this board, e.g. to check a hash or killer move before playing it
+        size = self.board_state.shape[0]
+        return 0 <= move[0] < size and 0 <= move[1] < size and self.board_state[move] == 0
 
-        return score
+    def generate_weights(self, size):#positional weights for a grid size, shared and read-only
+        return geometry(size).weights
+    
+    def evaluate_board(self):#evaluate board state from the incrementally maintained triplet windows
+        if self._windows is None:
+            self._init_windows()
+        return self._score
     
     def evaluate_line(self, line):
         score = 0
@@ -0,0 +1,97 @@
+#batch_analysis.py
+"""
+Score many positions at once, e.g. for offline analysis and tuning:
+
+    for index, score, move in analyze_positions(boards, turn_O, depth=2, workers=4):
+        ...
+
+boards is an (N, size, size) array (1 = O, -1 = X, 0 = empty), a memmap works too. Static scores are computed
+with NumPy over whole chunks, searches run on a process pool; results stream back in input order.
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from GameStatus_51202 import GameStatus, window_scores
+from board_geometry import geometry
+from multiAgents2 import minimax, negamax, pvs
+from transposition import TranspositionTable
+
+def count_triplets(boards):#return (O triplets, X triplets) arrays for an (N, size, size) array of boards
+    boards = np.asarray(boards)
+    geo = geometry(boards.shape[1])
+    cells = boards.reshape(len(boards), -1)[:, geo.window_array] #(N, windows, 3)
+    return (cells == 1).all(axis=2).sum(axis=1), (cells == -1).all(axis=2).sum(axis=1)
+
+def evaluate_boards(boards):#GameStatus.evaluate_board() of every board, as an array
+    boards = np.asarray(boards)
+    geo = geometry(boards.shape[1])
+    cells = boards.reshape(len(boards), -1)[:, geo.window_array]
+    weights = geo.weights.ravel()[geo.window_array] #(windows, 3)
+    O_cells = cells == 1
+    X_cells = cells == -1
+    scores = window_scores(O_cells.sum(axis=2), X_cells.sum(axis=2), (O_cells * weights).sum(axis=2), (X_cells * weights).sum(axis=2))
+    return scores.sum(axis=1)
+
+def score_boards(boards):#GameStatus.get_scores() of every board: +-1000 / 0 for finished games, evaluate_board() otherwise
+    boards = np.asarray(boards)
+    size = boards.shape[1]
+    O_triplets, X_triplets = count_triplets(boards)
+    full = ~(boards.reshape(len(boards), -1) == 0).any(axis=1)
+    if size == 3:#the first triplet ends the game, no position has both
+        finished = full | (O_triplets > 0) | (X_triplets > 0)
+    else:
+        finished = full
+    outcome = np.sign(O_triplets - X_triplets) * 1000
+    return np.where(finished, outcome, evaluate_boards(boards))
+
+def _search_chunk(boards, turn_O, depth, algorithm):#worker task: [(score from O's view, move)] for a chunk of boards
+    results = []
+    for board, side in zip(boards, turn_O):
+        state = GameStatus(np.array(board, dtype=int), bool(side))
+        tt = TranspositionTable(4)
+        if algorithm == 'minimax':
+            score, move = minimax(state, depth, state.turn_O, tt=tt)
+        else:
+            search = pvs if algorithm == 'pvs' else negamax
+            color = 1 if state.turn_O else -1
+            score, move = search(state, depth, color, tt=tt)
+            score *= color
+        results.append((int(score), None if move is None else (int(move[0]), int(move[1]))))
+    return results
+
+def _chunks(boards, turn_O, chunk_size):#(start index, boards, side to move) slices, read lazily
+    for start in range(0, len(boards), chunk_size):
+        yield start, np.asarray(boards[start:start + chunk_size]), turn_O[start:start + chunk_size]
+
+def analyze_positions(boards, turn_O=True, depth=0, algorithm='negamax', workers=1, chunk_size=256):
+    """
+    Yield (index, score, move) for every board, in order. Scores are from O's point of view like get_scores().
+    depth=0 scores the boards statically (move is None), otherwise each board gets a depth-limited search,
+    spread over workers processes with at most 2 * workers chunks in flight.
+    turn_O is one bool for all boards or one per board.
+    """
+    turn_O = np.broadcast_to(np.asarray(turn_O, dtype=bool), (len(boards),))
+    if depth == 0:
+        for start, chunk, _ in _chunks(boards, turn_O, chunk_size):
+            for offset, score in enumerate(score_boards(chunk)):
+                yield start + offset, int(score), None
+        return
+
+    chunks = _chunks(boards, turn_O, chunk_size)
+    if workers <= 1:
+        for start, chunk, sides in chunks:
+            for offset, (score, move) in enumerate(_search_chunk(chunk, sides, depth, algorithm)):
+                yield start + offset, score, move
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = [] #(start, future) in input order
+        for start, chunk, sides in itertools.islice(chunks, 2 * workers):
+            pending.append((start, pool.submit(_search_chunk, chunk, sides, depth, algorithm)))
+        while pending:
+            start, future = pending.pop(0)
+            results = future.result()
+            for next_start, chunk, sides in itertools.islice(chunks, 1):#keep the pool busy while this chunk is consumed
+                pending.append((next_start, pool.submit(_search_chunk, chunk, sides, depth, algorithm)))
+            for offset, (score, move) in enumerate(results):
+                yield start + offset, score, move
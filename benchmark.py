@@ -0,0 +1,156 @@
+#benchmark.py
+"""
+Headless AI-vs-AI self-play benchmark, no pygame needed. Writes a JSON report, e.g.
+
+    python benchmark.py --sizes 3 4 5 --depths 2 3 --algorithms minimax negamax --games 2 --output bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import numpy as np
+import multiAgents2
+from GameStatus_51202 import GameStatus
+from bitboard_status import BitboardGameStatus
+from multiAgents2 import minimax, negamax, pvs, iterative_deepening
+from move_ordering import MoveOrdering
+from search_stats import SearchStats
+from transposition import TranspositionTable
+
+def new_game(size, backend='numpy'):#empty board, 'O' to move
+    board = np.zeros((size, size), dtype=int)
+    if backend == 'bitboard':
+        return BitboardGameStatus.from_array(board, True)
+    return GameStatus(board, True)
+
+def search(state, algorithm, depth, tt, stats, time_budget_ms=None, ordering=None):#one AI decision, returns (score, move)
+    if ordering is not None:
+        ordering.age()
+    if time_budget_ms is not None:
+        score, move, _ = iterative_deepening(state, time_budget_ms, algorithm, tt=tt, stats=stats, ordering=ordering)
+        return score, move
+    stats.start()
+    if algorithm == 'negamax':
+        result = negamax(state, depth, 1 if state.turn_O else -1, tt=tt, stats=stats, ordering=ordering)
+    elif algorithm == 'pvs':
+        result = pvs(state, depth, 1 if state.turn_O else -1, tt=tt, stats=stats, ordering=ordering)
+    else:
+        result = minimax(state, depth, state.turn_O, tt=tt, stats=stats, ordering=ordering)
+    stats.stop()
+    return result
+
+def latency_summary(latencies_ms):#percentiles of per-move search time
+    if not latencies_ms:
+        return {}
+    values = np.array(latencies_ms)
+    return {
+        'count': len(latencies_ms),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p90_ms': float(np.percentile(values, 90)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max()),
+    }
+
+def play_game(size, algorithm, depth, backend='numpy', opening_plies=2, seed=0, max_plies=None, use_tt=True, time_budget_ms=None, use_ordering=True):
+    """
+    Play one AI-vs-AI game and return its record: moves, winner, search counters and per-move latency.
+    The first opening_plies moves are random (seeded) so repeated games cover different positions.
+    """
+    rng = random.Random(seed)
+    state = new_game(size, backend)
+    tt = TranspositionTable() if use_tt else None
+    ordering = MoveOrdering() if use_ordering else None
+    stats = SearchStats()
+    moves = []
+    latencies_ms = []
+    start = time.perf_counter()
+
+    while not state.is_terminal() and (max_plies is None or len(moves) < max_plies):
+        if len(moves) < opening_plies:
+            empty = [tuple(int(v) for v in cell) for cell in np.argwhere(state.board_state == 0)]
+            move = rng.choice(empty)
+        else:
+            t0 = time.perf_counter()
+            _, move = search(state, algorithm, depth, tt, stats, time_budget_ms, ordering)
+            latencies_ms.append((time.perf_counter() - t0) * 1000)
+        move = (int(move[0]), int(move[1]))
+        moves.append(move)
+        state = state.get_new_state(move)
+
+    total_time = time.perf_counter() - start
+    search_time = sum(latencies_ms) / 1000
+    record = {
+        'size': size,
+        'algorithm': algorithm,
+        'depth': depth,
+        'time_budget_ms': time_budget_ms,
+        'backend': backend,
+        'seed': seed,
+        'moves': moves,
+        'winner': state.winner if state.is_terminal() else None,
+        'total_time_s': total_time,
+        'search_time_s': search_time,
+        'nodes_per_sec': stats.nodes / search_time if search_time > 0 else None,
+        'latency': latency_summary(latencies_ms),
+    }
+    record.update(stats.as_dict())
+    if tt is not None:
+        record['transposition_table'] = tt.stats()
+    return record
+
+def run_benchmark(sizes, depths, algorithms, games=1, backend='numpy', opening_plies=2, seed=0, max_plies=None, use_tt=True, time_budget_ms=None, use_ordering=True):
+    """
+    Play every (size, depth, algorithm) combination games times and return a JSON-serializable report.
+    """
+    results = []
+    for size in sizes:
+        for depth in depths:
+            for algorithm in algorithms:
+                for game in range(games):
+                    record = play_game(size, algorithm, depth, backend, opening_plies, seed + game, max_plies, use_tt, time_budget_ms, use_ordering)
+                    results.append(record)
+                    print(f"{size}x{size} {algorithm} depth {depth} game {game + 1}: {record['winner']}, "
+                          f"{record['nodes']} nodes, {record['total_time_s']:.2f}s", file=sys.stderr)
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless AI-vs-AI self-play benchmark.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3, 4, 5], help='grid sizes to play (3-10)')
+    parser.add_argument('--depths', type=int, nargs='+', default=[2], help='fixed search depths')
+    parser.add_argument('--algorithms', nargs='+', default=['minimax', 'negamax'], choices=['minimax', 'negamax', 'pvs'])
+    parser.add_argument('--games', type=int, default=1, help='games per combination')
+    parser.add_argument('--backend', default='numpy', choices=['numpy', 'bitboard'])
+    parser.add_argument('--opening-plies', type=int, default=2, help='random moves at the start of each game')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-plies', type=int, default=None, help='stop each game after this many moves')
+    parser.add_argument('--no-tt', action='store_true', help='search without a transposition table')
+    parser.add_argument('--no-ordering', action='store_true', help='search without killer moves and history')
+    parser.add_argument('--threat-plies', type=int, default=multiAgents2.THREAT_EXTENSION_PLIES, help='forcing moves to search past the depth limit (0 = off)')
+    parser.add_argument('--budget-ms', type=int, default=None, help='use iterative deepening with this per-move budget instead of a fixed depth')
+    parser.add_argument('--output', default=None, help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        if not 3 <= size <= 10:
+            parser.error(f"grid size {size} is outside 3-10")
+    multiAgents2.THREAT_EXTENSION_PLIES = args.threat_plies
+
+    report = run_benchmark(args.sizes, args.depths, args.algorithms, args.games, args.backend,
+                           args.opening_plies, args.seed, args.max_plies, not args.no_tt, args.budget_ms, not args.no_ordering)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+#bitboard_status.py
+import numpy as np
+from GameStatus_51202 import GameStatus, window_score
+from transposition import piece_key
+from board_geometry import geometry
+
+_mask_cache = {}#per-size triplet masks and weight bit-planes, built on first use
+_cell_window_cache = {}#per-size (mask, weight lookup) of the windows through each cell, built on first use
+
+def triplet_masks(size):#return (triplet masks, weight planes) for a grid size
+    if size in _mask_cache:
+        return _mask_cache[size]
+
+    geo = geometry(size)
+    masks = [(1 << a) | (1 << b) | (1 << c) for a, b, c in geo.windows]
+
+    #split positional weights into bit-planes so weighted sums become popcounts
+    planes = []
+    for p in range(max(geo.flat_weights).bit_length()):
+        plane = 0
+        for idx, weight in enumerate(geo.flat_weights):
+            if (weight >> p) & 1:
+                plane |= 1 << idx
+        planes.append((1 << p, plane))
+
+    _mask_cache[size] = (masks, planes)
+    return _mask_cache[size]
+
+def cell_window_masks(size):#per cell, [(window mask, {bits of the window: weight sum of those cells})] of the windows through it
+    if size in _cell_window_cache:
+        return _cell_window_cache[size]
+
+    geo = geometry(size)
+    window_info = []
+    for window in geo.windows:
+        mask = 0
+        weights = {0: 0}
+        for idx in window:
+            bit = 1 << idx
+            weights.update({bits | bit: weight + geo.flat_weights[idx] for bits, weight in weights.items()})
+            mask |= bit
+        window_info.append((mask, weights))
+    _cell_window_cache[size] = [[window_info[w] for w in ids] for ids in geo.cell_windows]
+    return _cell_window_cache[size]
+
+def _popcount(bits):
+    return bits.bit_count()
+
+class BitboardGameStatus(GameStatus):
+    """
+    GameStatus backed by two integer bitmasks (one bit per cell, row-major) instead of a NumPy array.
+    Supports in-place make_move()/unmake_move() and exposes the same API as GameStatus. Like GameStatus, the
+    evaluation and triplet counts are kept up to date move by move, from the triplet windows through the placed cell.
+    """
+    __slots__ = ('O_bits', 'X_bits', 'size', 'full_mask')
+
+    def __init__(self, O_bits, X_bits, size, turn_O, zobrist_hash=None):
+        self.O_bits = O_bits
+        self.X_bits = X_bits
+        self.size = size
+        self.full_mask = (1 << (size * size)) - 1
+        self.turn_O = turn_O
+        self.winner = None
+        self._zobrist_hash = zobrist_hash
+        self._symmetry_hashes = None
+        self.frontier_radius = None
+        self.max_moves = None
+        self._frontier_bits = None
+        self._frontier_stack = [] #frontier before each make_move(), popped by unmake_move()
+        self._score = None #running evaluate_board() total, computed on first use
+        self._triplets = None #(O triplets, X triplets), counted on first use
+
+    @classmethod
+    def from_array(cls, board_state, turn_O):#build from a NumPy board (1 = O, -1 = X, 0 = empty)
+        size = board_state.shape[0]
+        O_bits = 0
+        X_bits = 0
+        for idx, cell in enumerate(np.asarray(board_state).ravel()):
+            if cell == 1:
+                O_bits |= 1 << idx
+            elif cell == -1:
+                X_bits |= 1 << idx
+        return cls(O_bits, X_bits, size, turn_O)
+
+    def __getstate__(self):#pickle only the board, hashes and frontier, e.g. for the parallel search workers
+        return (self.O_bits, self.X_bits, self.size, self.turn_O, self._zobrist_hash, self._symmetry_hashes,
+                self.frontier_radius, self.max_moves, self._frontier_bits)
+
+    def __setstate__(self, state):
+        O_bits, X_bits, size, turn_O, zobrist_hash, symmetry_hashes, frontier_radius, max_moves, frontier_bits = state
+        self.__init__(O_bits, X_bits, size, turn_O, zobrist_hash)
+        self._symmetry_hashes = symmetry_hashes
+        self.frontier_radius, self.max_moves = frontier_radius, max_moves
+        self._frontier_bits = frontier_bits
+
+    @property
+    def grid_size(self):
+        return self.size
+
+    @property
+    def board_state(self):#NumPy view of the board for callers that expect an array
+        board = np.zeros(self.size * self.size, dtype=int)
+        for idx in range(self.size * self.size):
+            if (self.O_bits >> idx) & 1:
+                board[idx] = 1
+            elif (self.X_bits >> idx) & 1:
+                board[idx] = -1
+        return board.reshape(self.size, self.size)
+
+    @property
+    def empty_count(self):
+        return self.size * self.size - _popcount(self.O_bits | self.X_bits)
+
+    def is_terminal(self):
+        if self.winner is not None:
+            return True
+        if self.size == 3:#the first triplet ends the game
+            O_triplets, X_triplets = self.triplet_counts()
+            if O_triplets or X_triplets:
+                self.winner = 'O' if O_triplets else 'X'
+                return True
+        if (self.O_bits | self.X_bits) != self.full_mask:
+            return False
+        O_triplets, X_triplets = self.triplet_counts()
+        if O_triplets > X_triplets:
+            self.winner = 'O'
+        elif X_triplets > O_triplets:
+            self.winner = 'X'
+        else:
+            self.winner = 'Draw'
+        return True
+
+    def check_winner(self):
+        if self.size != 3:
+            return None # grids > 3x3, do not return a winner based on a single triplet
+        masks, _ = triplet_masks(3)
+        for mask in masks:
+            if self.O_bits & mask == mask:
+                return 'O'
+            if self.X_bits & mask == mask:
+                return 'X'
+        return None
+
+    def count_triplets(self, symbol):
+        O_triplets, X_triplets = self.triplet_counts()
+        return O_triplets if symbol == 1 else X_triplets
+
+    def triplet_counts(self):#(O triplets, X triplets), kept up to date by make_move()
+        if self._triplets is None:
+            masks, _ = triplet_masks(self.size)
+            self._triplets = (sum(1 for mask in masks if self.O_bits & mask == mask), sum(1 for mask in masks if self.X_bits & mask == mask))
+        return self._triplets
+
+    def _completed(self, idx, bits):#number of triplets that the stones in bits complete once cell idx is added
+        bits |= 1 << idx
+        return sum(1 for mask, _ in cell_window_masks(self.size)[idx] if bits & mask == mask)
+
+    def threat_cells(self, symbol):#same as GameStatus.threat_cells(), from the triplet masks
+        own, other = (self.O_bits, self.X_bits) if symbol == 1 else (self.X_bits, self.O_bits)
+        masks, _ = triplet_masks(self.size)
+        found = set()
+        for mask in masks:
+            if not other & mask and _popcount(own & mask) == 2:
+                found.add((mask & ~own).bit_length() - 1)
+        return sorted(found)
+
+    def threat_making_cells(self, symbol):#same as GameStatus.threat_making_cells(), from the triplet masks
+        own, other = (self.O_bits, self.X_bits) if symbol == 1 else (self.X_bits, self.O_bits)
+        masks, _ = triplet_masks(self.size)
+        bits = 0
+        for mask in masks:
+            if not other & mask and _popcount(own & mask) == 1:
+                bits |= mask & ~own
+        found = []
+        while bits:
+            low = bits & -bits
+            found.append(low.bit_length() - 1)
+            bits ^= low
+        return found
+
+    def is_empty(self, move):
+        if not (0 <= move[0] < self.size and 0 <= move[1] < self.size):
+            return False
+        return not ((self.O_bits | self.X_bits) >> (move[0] * self.size + move[1])) & 1
+
+    def evaluate_board(self):#same scoring as GameStatus.evaluate_board, kept up to date by make_move()
+        if self._score is None:
+            self._score = self._scan_score()
+        return self._score
+
+    def _score_delta(self, idx, symbol):#change of evaluate_board() when symbol is placed on the empty cell idx
+        bit = 1 << idx
+        O_bits = self.O_bits
+        X_bits = self.X_bits
+        delta = 0
+        for mask, weights in cell_window_masks(self.size)[idx]:
+            O_line = O_bits & mask
+            X_line = X_bits & mask
+            O_count = _popcount(O_line)
+            X_count = _popcount(X_line)
+            delta -= window_score(O_count, X_count, weights[O_line], weights[X_line])
+            if symbol == 1:
+                delta += window_score(O_count + 1, X_count, weights[O_line | bit], weights[X_line])
+            else:
+                delta += window_score(O_count, X_count + 1, weights[O_line], weights[X_line | bit])
+        return delta
+
+    def _scan_score(self):#evaluate_board() from scratch, using popcounts
+        masks, planes = triplet_masks(self.size)
+        O_bits = self.O_bits
+        X_bits = self.X_bits
+        score = 0
+        for mask in masks:
+            O_line = O_bits & mask
+            X_line = X_bits & mask
+            if O_line and not X_line:
+                O_weight = sum(value * _popcount(O_line & plane) for value, plane in planes)
+                score += O_weight ** 2
+                if _popcount(O_line) == 2:
+                    score += O_weight * 10
+            elif X_line and not O_line:
+                X_weight = sum(value * _popcount(X_line & plane) for value, plane in planes)
+                score -= X_weight ** 2
+                if _popcount(X_line) == 2:
+                    score -= X_weight * 10
+        return score
+
+    def _init_frontier(self):
+        masks = geometry(self.size).neighborhood_masks(self.frontier_radius)
+        occupied = self.O_bits | self.X_bits
+        frontier = 0
+        bits = occupied
+        while bits:
+            low = bits & -bits
+            frontier |= masks[low.bit_length() - 1]
+            bits ^= low
+        self._frontier_bits = frontier & ~occupied
+        self._frontier_stack = []
+
+    def _candidate_bits(self):#bitmask of the empty cells get_moves() considers, see GameStatus.candidate_cells()
+        if self.frontier_radius is not None:
+            if self._frontier_bits is None:
+                self._init_frontier()
+            if self._frontier_bits:
+                return self._frontier_bits
+        return ~(self.O_bits | self.X_bits) & self.full_mask
+
+    def candidate_cells(self):
+        bits = self._candidate_bits()
+        cells = []
+        while bits:
+            low = bits & -bits
+            cells.append(low.bit_length() - 1)
+            bits ^= low
+        return np.array(cells)
+
+    def make_move(self, move):#place the side to move's symbol in place
+        x, y = move
+        idx = x * self.size + y
+        bit = 1 << idx
+        symbol = 1 if self.turn_O else -1
+        self._zobrist_hash = self.zobrist_hash ^ piece_key(self.size, move, symbol)
+        if self._symmetry_hashes is not None:
+            self._symmetry_hashes = self._symmetry_hashes_after(move, symbol)
+        if self._frontier_bits is not None:
+            self._frontier_stack.append(self._frontier_bits)
+            occupied = self.O_bits | self.X_bits | bit
+            self._frontier_bits = (self._frontier_bits | geometry(self.size).neighborhood_masks(self.frontier_radius)[idx]) & ~occupied
+        if self._score is not None:
+            self._score += self._score_delta(idx, symbol)
+        if self._triplets is not None:
+            O_triplets, X_triplets = self._triplets
+            if self.turn_O:
+                self._triplets = (O_triplets + self._completed(idx, self.O_bits), X_triplets)
+            else:
+                self._triplets = (O_triplets, X_triplets + self._completed(idx, self.X_bits))
+        if self.turn_O:
+            self.O_bits |= bit
+        else:
+            self.X_bits |= bit
+        self.turn_O = not self.turn_O
+        self.winner = None
+
+    def unmake_move(self, move):#undo make_move()
+        x, y = move
+        idx = x * self.size + y
+        bit = 1 << idx
+        self.turn_O = not self.turn_O
+        if self.turn_O:
+            self.O_bits &= ~bit
+        else:
+            self.X_bits &= ~bit
+        self.winner = None
+        symbol = 1 if self.turn_O else -1
+        if self._score is not None:
+            self._score -= self._score_delta(idx, symbol)
+        if self._triplets is not None:
+            O_triplets, X_triplets = self._triplets
+            if self.turn_O:
+                self._triplets = (O_triplets - self._completed(idx, self.O_bits), X_triplets)
+            else:
+                self._triplets = (O_triplets, X_triplets - self._completed(idx, self.X_bits))
+        self._zobrist_hash ^= piece_key(self.size, move, symbol)
+        if self._symmetry_hashes is not None:
+            self._symmetry_hashes = self._symmetry_hashes_after(move, symbol) #xor is its own inverse
+        if self._frontier_bits is not None:
+            #rebuilt lazily if the frontier was first built after this move was made
+            self._frontier_bits = self._frontier_stack.pop() if self._frontier_stack else None
+
+    def get_moves(self):
+        move_scores = []
+        score = self.evaluate_board()
+        symbol = 1 if self.turn_O else -1
+        candidates = self._candidate_bits()
+        while candidates:#score each child from the windows through its cell only
+            low = candidates & -candidates
+            candidates ^= low
+            idx = low.bit_length() - 1
+            move_scores.append((score + self._score_delta(idx, symbol), divmod(idx, self.size)))
+
+        #sort moves by score in descending order
+        move_scores.sort(reverse=self.turn_O)  #maximize if 'O's turn, minimize if 'X's turn
+        return self._limit_moves([move for score, move in move_scores])
+
+    def copy(self):
+        new_state = BitboardGameStatus(self.O_bits, self.X_bits, self.size, self.turn_O, self._zobrist_hash)
+        new_state._symmetry_hashes = self._symmetry_hashes
+        new_state._score = self._score
+        new_state._triplets = self._triplets
+        new_state.frontier_radius, new_state.max_moves = self.frontier_radius, self.max_moves
+        new_state._frontier_bits = self._frontier_bits
+        return new_state
+
+    def get_new_state(self, move):
+        new_state = BitboardGameStatus(self.O_bits, self.X_bits, self.size, self.turn_O, self.zobrist_hash)
+        new_state._symmetry_hashes = self._symmetry_hashes
+        new_state._score = self._score
+        new_state._triplets = self._triplets
+        if self.frontier_radius is not None or self.max_moves is not None:
+            new_state.frontier_radius = self.frontier_radius
+            new_state.max_moves = self.max_moves
+            new_state._frontier_bits = self._frontier_bits
+        new_state.make_move(move)
+        return new_state
@@ -0,0 +1,92 @@
+#board_geometry.py
+import numpy as np
+
+_geometry_cache = {}#one BoardGeometry per grid size, built on first use
+
+def compute_weights(size):#positional weights, closer to the center = higher weight
+    #create coordinate grids
+    x = np.arange(size)
+    y = np.arange(size)
+    xv, yv = np.meshgrid(x, y)
+
+    #calculate distances from the center
+    center = (size - 1) / 2
+    distances = np.sqrt((xv - center) ** 2 + (yv - center) ** 2)
+
+    #invert distances to get weights (closer to center = higher weight)
+    max_distance = np.max(distances)
+    weights = (max_distance - distances) + 1  #add 1 to ensure weights are positive
+
+    #normalize weights to have integers
+    return weights.astype(int)
+
+class BoardGeometry:
+    """
+    Everything about a grid size that never changes during a game: positional weights, every
+    horizontal/vertical/diagonal/anti-diagonal triplet window, the windows through each cell and the
+    8 rotations/reflections of the board as cell permutations.
+    Shared by all GameStatus instances of that size, never modify it.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.weights = compute_weights(size)
+        self.weights.setflags(write=False)
+        self.flat_weights = [int(w) for w in self.weights.ravel()]
+
+        windows = []
+        for i in range(size):
+            for j in range(size - 2):
+                windows.append((i * size + j, i * size + j + 1, i * size + j + 2)) #row
+                windows.append((j * size + i, (j + 1) * size + i, (j + 2) * size + i)) #column
+        for i in range(size - 2):
+            for j in range(size - 2):
+                windows.append((i * size + j, (i + 1) * size + j + 1, (i + 2) * size + j + 2)) #diagonal
+                windows.append(((i + 2) * size + j, (i + 1) * size + j + 1, i * size + j + 2)) #anti-diagonal
+        self.windows = windows #list of (cell, cell, cell) flat indices
+        self.window_array = np.array(windows).reshape(-1, 3) #same windows as an (n_windows, 3) index array
+        self.window_array.setflags(write=False)
+
+        #reverse index: ids of the windows through each cell
+        self.cell_windows = [[] for _ in range(size * size)]
+        for w, window in enumerate(windows):
+            for idx in window:
+                self.cell_windows[idx].append(w)
+
+        #same reverse index as a rectangular array, padded with len(windows) (a dummy window id)
+        width = max(len(ids) for ids in self.cell_windows)
+        self.cell_window_array = np.full((size * size, width), len(windows))
+        for idx, ids in enumerate(self.cell_windows):
+            self.cell_window_array[idx, :len(ids)] = ids
+        self.cell_window_array.setflags(write=False)
+
+        #the 8 symmetries of the square (rotations and reflections) as cell permutations:
+        #transformed.ravel() == board.ravel()[perm], the evaluation is the same for all of them
+        cells = np.arange(size * size).reshape(size, size)
+        transforms = [np.rot90(cells, k) for k in range(4)] + [np.rot90(cells.T, k) for k in range(4)]
+        self.symmetries = np.array([t.ravel() for t in transforms])
+        self.inverse_symmetries = np.argsort(self.symmetries, axis=1) #board.ravel() == transformed.ravel()[inverse]
+        self.symmetries.setflags(write=False)
+        self.inverse_symmetries.setflags(write=False)
+        #cell_orbits[idx][t] = where cell idx lands under symmetry t, as plain ints for per-move use
+        self.cell_orbits = [tuple(int(self.inverse_symmetries[t][idx]) for t in range(8)) for idx in range(size * size)]
+
+        self._neighborhoods = {}
+
+    def neighborhood_masks(self, radius):#per cell, bitmask (bit = flat index) of the cells within radius rows/columns of it
+        if radius not in self._neighborhoods:
+            size = self.size
+            masks = []
+            for r in range(size):
+                for c in range(size):
+                    mask = 0
+                    for rr in range(max(0, r - radius), min(size, r + radius + 1)):
+                        for cc in range(max(0, c - radius), min(size, c + radius + 1)):
+                            mask |= 1 << (rr * size + cc)
+                    masks.append(mask)
+            self._neighborhoods[radius] = masks
+        return self._neighborhoods[radius]
+
+def geometry(size):#return the shared BoardGeometry for a grid size
+    if size not in _geometry_cache:
+        _geometry_cache[size] = BoardGeometry(size)
+    return _geometry_cache[size]
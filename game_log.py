@@ -0,0 +1,56 @@
+#game_log.py
+"""
+Game records as JSON Lines, one object per event:
+
+    {"event": "game_start", "game": 1729180000123, "size": 5, ...}
+    {"event": "move", "game": 1729180000123, "ply": 1, "symbol": "X", "by": "player", "move": [3, 1]}
+    {"event": "game_over", "game": 1729180000123, "winner": "O", "moves": [[3, 1], [2, 2], ...]}
+
+Records are handed to a queue and written by a background thread, so logging a move costs the game loop
+one queue put. The file rotates at max_bytes, keeping backup_count old files (game_log.jsonl.1, ...).
+"""
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+GAME_LOG_PATH = 'game_log.jsonl'
+
+class _RecordQueueHandler(QueueHandler):
+    def prepare(self, record):#enqueue the record as is, formatting happens in the listener thread
+        return record
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):#record.msg is the event dict
+        fields = dict(record.msg)
+        fields['time'] = round(record.created, 3)
+        return json.dumps(fields, separators=(',', ':'))
+
+class GameLog:
+    """
+    Queued, rotating JSON Lines writer for game records. Call close() before exiting to flush the queue.
+    """
+    def __init__(self, path=GAME_LOG_PATH, max_bytes=1024 * 1024, backup_count=5):
+        self.queue = queue.SimpleQueue()
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        handler.setFormatter(JsonLinesFormatter())
+        self.listener = QueueListener(self.queue, handler)
+        self.queue_handler = _RecordQueueHandler(self.queue)
+        self.logger = logging.getLogger(f'{__name__}.{id(self)}')
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False #keep game records out of the root logger
+        self.logger.addHandler(self.queue_handler)
+        self.listener.start()
+
+    def record(self, event, **fields):#queue one event, fields must be JSON-serializable
+        self.logger.info({'event': event, **fields})
+
+    def close(self):#write everything still queued and stop the writer thread
+        self.listener.stop()
+        self.logger.removeHandler(self.queue_handler)
+        for handler in self.listener.handlers:
+            handler.close()
+
+def new_game_id():#id shared by the records of one game, the start time in milliseconds
+    return int(time.time() * 1000)
@@ -2,18 +2,18 @@ import pygame
 import numpy as np
 import pygame_menu
 from GameStatus_51202 import GameStatus
-from multiAgents2 import minimax, negamax
+from bitboard_status import BitboardGameStatus
+from multiAgents2 import iterative_deepening, shutdown_process_pool, cancel_hook, tt_best_move, MCTS
+from transposition import TranspositionTable
+from move_ordering import MoveOrdering
+from search_stats import SearchStats
+from opening_book import OpeningBook, BOOK_PATH
+from game_log import GameLog, new_game_id
+from concurrent.futures import ThreadPoolExecutor
+import os
 import sys
+import threading
 import time
-import logging
-
-# set up logging for tracking game actions
-logging.basicConfig(
-    filename='game_log.txt',
-    filemode='a', #append logs to game_log.txt
-    level=logging.INFO,
-    format='%(message)s'
-)
 
 class TicTacToeGame:
     """
@@ -64,6 +64,19 @@ class TicTacToeGame:
         self.ai_symbol = 'O'
         self.score = {'Player 1': 0, 'Player 2': 0, 'Draws': 0}
         self.algorithm = 'Minimax'  # default algorithm
+        self.board_backend = 'numpy'  # default board representation
+        self.tt_size_mb = 16  # memory cap for the AI's transposition table
+        self.ai_time_budget_ms = 2000  # wall-clock budget for each AI move
+        self.pondering = True  # search the AI's reply to the expected player move while the player thinks
+        self.ponder_time_budget_ms = 60000  # upper bound for one ponder search, it normally stops when the player moves
+        self.ai_workers = os.cpu_count() or 1  # processes used by the parallel search
+        self.search_hooks = []  # hook(event, stats) callables attached to every AI search, e.g. profilers
+        # on large grids the AI only considers cells near existing stones, keeping the best few after ordering
+        self.frontier_min_size = 7
+        self.frontier_radius = 2
+        self.max_candidate_moves = 12
+        # precomputed moves for 3x3 and the first plies of larger grids, memory-mapped (see opening_book.py)
+        self.opening_book = OpeningBook.load(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
 
         #initialize pygame display and clock for framerate
         pygame.init()
@@ -74,7 +87,28 @@ class TicTacToeGame:
         self.menu = None  #menu placeholder
         self.board_state = None #placeholder for the game board state
         self.game_state = None #track current game state (player turns, win state)
+        self.transposition_table = None #search cache, reset every game
         self.game_over = False #game over flag
+        #render caches: scaled images per resolution, board background per grid size, symbol sprites per cell size
+        self.image_cache = {}
+        self.board_cache = {}
+        self.sprite_cache = {}
+        self.score_font = None
+        self.dirty_rects = [] #screen areas changed since the last flush_display()
+        self.thinking_banner = None #area of the 'AI thinking...' banner while it is shown
+        self.thinking_font = None
+        # game records, written to game_log.jsonl by a background thread (see game_log.py)
+        self.game_log = GameLog()
+        self.game_id = None
+        self.game_moves = [] #[row, col] of every move of the current game
+        #the AI searches in a background thread so the window keeps responding
+        self.ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai')
+        self.ai_future = None #pending search, result is search_ai_move()'s
+        self.ai_cancel = threading.Event()
+        self.ponder_future = None #search of the AI's reply to ponder_move, started on the player's turn
+        self.ponder_cancel = threading.Event()
+        self.ponder_move = None #expected player move, None until pondering starts on the player's turn
+        self.ponder_started = None
 
     def play_hover_sound(self):
             self.hover_sound_effect.play()#play hover sound over buttons
@@ -105,20 +139,35 @@ class TicTacToeGame:
     def set_algorithm(self, value, algorithm):#set algorithm based on player selection
         self.algorithm = algorithm.lower()
 
+    def set_board_backend(self, value, backend):#set board representation based on player selection
+        self.board_backend = backend
+
     def set_player_symbol(self, value, symbol):#set player symbol based on player selection
         self.player_symbol = symbol
         self.ai_symbol = 'O' if symbol == 'X' else 'X'
 
     def start_game(self):#start game with player selections
+        self.cancel_ai_move() #a search left over from an abandoned game
         self.switch_to_gameplay_music() #switch to gameplay music
         #Create empty board with zeros
         self.board_state = np.zeros((self.GRID_SIZE, self.GRID_SIZE), dtype=int)
         # Initialize GameStatus, 'O' always starts first in Tic Tac Toe
-        self.game_state = GameStatus(self.board_state, turn_O=(self.player_symbol == 'O'))
+        if self.board_backend == 'bitboard':
+            self.game_state = BitboardGameStatus.from_array(self.board_state, turn_O=(self.player_symbol == 'O'))
+        else:
+            self.game_state = GameStatus(np.copy(self.board_state), turn_O=(self.player_symbol == 'O'))
+        if self.GRID_SIZE >= self.frontier_min_size:
+            self.game_state.set_move_generation(self.frontier_radius, self.max_candidate_moves)
+        self.transposition_table = TranspositionTable(self.tt_size_mb)
+        self.move_ordering = MoveOrdering() # killer moves and history, kept for the whole game
+        self.mcts_tree = MCTS() # search tree of the MCTS algorithm, reused from move to move
         self.game_over = False # Reset the game over flag
         self.move_count = 1 #initialize move count
         #log start of new game
-        logging.info(f"## New Game Started: {self.GRID_SIZE}x{self.GRID_SIZE} Grid, Mode: {self.game_mode}, Algorithm: {self.algorithm.capitalize()}")
+        self.game_id = new_game_id()
+        self.game_moves = []
+        self.game_log.record('game_start', game=self.game_id, size=self.GRID_SIZE, mode=self.game_mode, algorithm=self.algorithm,
+                             backend=self.board_backend, player=self.player_symbol, first='O' if self.game_state.turn_O else 'X')
         self.main_loop()
 
     def handle_hover(self, widget, menu):#play hover sound when mouse hovers over buttons
@@ -130,8 +179,7 @@ class TicTacToeGame:
             self.play_click_sound()  # Play click sound on button press
 
     def main_menu(self):#main menu for player selections
-        background_image = pygame.image.load('UI_background.jpg')
-        background_image = pygame.transform.scale(background_image, (self.width, self.height))
+        background_image = self.load_scaled('UI_background.jpg')
         #function to draw backgroudn image
         def draw_background():
             self.screen.blit(background_image, (0, 0))
@@ -183,7 +231,8 @@ class TicTacToeGame:
         self.menu.add.selector('Grid Size :', [(f'{i}x{i}', i) for i in range(3, 11)], onchange=self.set_grid_size, padding=(10,10))
         self.menu.add.selector('Game Mode :', [('Player vs Computer', 'Player vs Computer'), ('Player vs Player', 'Player vs Player')], onchange=self.set_game_mode, padding=(10,10))
         self.menu.add.selector('Your Symbol :', [('X', 'X'), ('O', 'O')], onchange=self.set_player_symbol, padding=(10,10))
-        self.menu.add.selector('Algorithm :', [('Minimax', 'minimax'), ('Negamax', 'negamax')], onchange=self.set_algorithm, padding=(10,10))
+        self.menu.add.selector('Algorithm :', [('Minimax', 'minimax'), ('Negamax', 'negamax'), ('Parallel', 'parallel'), ('PVS', 'pvs'), ('MCTS', 'mcts')], onchange=self.set_algorithm, padding=(10,10))
+        self.menu.add.selector('Board :', [('NumPy', 'numpy'), ('Bitboard', 'bitboard')], onchange=self.set_board_backend, padding=(10,10))
 
 
         self.menu.center_content()
@@ -223,43 +272,84 @@ class TicTacToeGame:
         #run the menu with the background function
         self.menu.mainloop(self.screen, bgfun=draw_background)
 
+    def load_scaled(self, path):#image scaled to the window, loaded once per path and resolution
+        key = (path, self.size)
+        if key not in self.image_cache:
+            self.image_cache[key] = pygame.transform.scale(pygame.image.load(path).convert(), self.size)
+        return self.image_cache[key]
+
+    def board_surface(self):#background image with the grid lines, rendered once per grid size and resolution
+        key = (self.GRID_SIZE, self.size)
+        if key not in self.board_cache:
+            surface = self.load_scaled('background.jpg').copy()
+            grid_size = self.GRID_SIZE #Determine grid size
+            cell_size = self.width / grid_size #calculate size of each cell
+
+            # draw grid lines
+            for i in range(1, grid_size):
+                pygame.draw.line(surface, self.LINE_COLOR, (i * cell_size, 0), (i * cell_size, self.height), 2)
+                pygame.draw.line(surface, self.LINE_COLOR, (0, i * cell_size), (self.width, i * cell_size), 2)
+            self.board_cache[key] = surface
+        return self.board_cache[key]
+
+    def symbol_sprite(self, symbol, cell_size):#transparent cell-sized image of a placed 'O' or 'X', rendered once per cell size
+        key = (symbol, cell_size)
+        if key not in self.sprite_cache:
+            sprite = pygame.Surface((int(cell_size) + 1, int(cell_size) + 1), pygame.SRCALPHA)
+            if symbol == 'O':
+                #draw 'O'
+                pygame.draw.circle(sprite, self.CIRCLE_COLOR, (cell_size / 2, cell_size / 2), cell_size / 3, 20)
+            else:
+                #draw 'X'
+                low, high = cell_size / 5, cell_size - cell_size / 5
+                pygame.draw.line(sprite, self.CROSS_COLOR, (low, low), (high, high), 20)
+                pygame.draw.line(sprite, self.CROSS_COLOR, (high, low), (low, high), 20)
+            self.sprite_cache[key] = sprite
+        return self.sprite_cache[key]
+
+    def cell_rect(self, row, col):#screen area of a cell
+        cell_size = self.width / self.GRID_SIZE
+        return pygame.Rect(int(col * cell_size), int(row * cell_size), int(cell_size) + 1, int(cell_size) + 1)
+
+    def mark_dirty(self, rect):#screen area to send to the display on the next flush_display()
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def flush_display(self):#update only the changed parts of the window
+        if self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+            self.dirty_rects = []
+
+    def redraw_area(self, rect):#repaint part of the board (background, grid and symbols) from the caches
+        rect = pygame.Rect(rect).clip(self.screen.get_rect())
+        self.screen.set_clip(rect)
+        self.screen.blit(self.board_surface(), rect, rect)
+        cell_size = self.width / self.GRID_SIZE
+        first_row, last_row = int(rect.top // cell_size), min(self.GRID_SIZE - 1, int((rect.bottom - 1) // cell_size))
+        first_col, last_col = int(rect.left // cell_size), min(self.GRID_SIZE - 1, int((rect.right - 1) // cell_size))
+        for i in range(first_row, last_row + 1):
+            for j in range(first_col, last_col + 1):
+                if self.board_state[i, j] != 0:
+                    sprite = self.symbol_sprite('O' if self.board_state[i, j] == 1 else 'X', cell_size)
+                    self.screen.blit(sprite, (int(j * cell_size), int(i * cell_size)))
+        self.screen.set_clip(None)
+        self.mark_dirty(rect)
+
     def draw_board(self):
         """
         Draws the TicTacToe grid and sets up the background image for the UI.  The grid size can vary based on theh player's selctions
         """
-        #load and scale background image
-        background_image = pygame.image.load('background.jpg')
-        background_image = pygame.transform.scale(background_image, (self.width, self.height))
-        self.screen.blit(background_image, (0, 0))
-
-        grid_size = self.GRID_SIZE #Determine grid size
-        cell_size = self.width / grid_size #calculate size of each cell
-
-        # draw grid lines
-        for i in range(1, grid_size):
-            pygame.draw.line(self.screen, self.LINE_COLOR, (i * cell_size, 0), (i * cell_size, self.height), 2)
-            pygame.draw.line(self.screen, self.LINE_COLOR, (0, i * cell_size), (self.width, i * cell_size), 2)
+        self.screen.blit(self.board_surface(), (0, 0))
+        self.mark_dirty(self.screen.get_rect())
 
     def draw_symbols(self):
-        grid_size = self.GRID_SIZE
-        cell_size = self.width / grid_size
-        for i in range(grid_size):
-            for j in range(grid_size):
-                x = j * cell_size
-                y = i * cell_size
-                if self.board_state[i, j] == 1:
-                    #draw 'O'
-                    center = (x + cell_size / 2, y + cell_size / 2)
-                    radius = cell_size / 3
-                    pygame.draw.circle(self.screen, self.CIRCLE_COLOR, center, radius, 20)
-                elif self.board_state[i, j] == -1:
-                    #draw 'X'
-                    start_pos = (x + cell_size / 5, y + cell_size / 5)
-                    end_pos = (x + cell_size - cell_size / 5, y + cell_size - cell_size / 5)
-                    pygame.draw.line(self.screen, self.CROSS_COLOR, start_pos, end_pos, 20)
-                    start_pos = (x + cell_size - cell_size / 5, y + cell_size / 5)
-                    end_pos = (x + cell_size / 5, y + cell_size - cell_size / 5)
-                    pygame.draw.line(self.screen, self.CROSS_COLOR, start_pos, end_pos, 20)
+        cell_size = self.width / self.GRID_SIZE
+        for i, j in zip(*np.nonzero(self.board_state)):
+            sprite = self.symbol_sprite('O' if self.board_state[i, j] == 1 else 'X', cell_size)
+            self.screen.blit(sprite, (int(j * cell_size), int(i * cell_size)))
+        self.mark_dirty(self.screen.get_rect())
+
+    def draw_cell(self, row, col):#redraw a single cell, e.g. after a move
+        self.redraw_area(self.cell_rect(row, col))
 
     def check_game_over(self):#check if game is over
         if self.game_state.is_terminal():
@@ -303,23 +393,23 @@ class TicTacToeGame:
         self.screen.blit(text, text_rect)
         pygame.display.update()
 
-        if self.game_state.winner != 'Draw':#log the winner
-            logging.info(f"Game over: {self.game_state.winner}!\n")
-        else:
-            logging.info("Game over: It's a draw!\n")
+        #log the result with the whole game as a move list
+        O_triplets, X_triplets = self.game_state.triplet_counts()
+        self.game_log.record('game_over', game=self.game_id, winner=self.game_state.winner, moves=self.game_moves, triplets=[O_triplets, X_triplets])
 
     def display_score(self):#display score on the game screen
         if self.GRID_SIZE > 3:
-            font = pygame.font.Font(None, 36)  #set font for score display
+            if self.score_font is None:
+                self.score_font = pygame.font.Font(None, 36)  #set font for score display
         
-            #get triplet counts
-            O_triplets = self.game_state.count_triplets(1)
-            X_triplets = self.game_state.count_triplets(-1)
+            #triplet counts are kept up to date by the game state
+            O_triplets, X_triplets = self.game_state.triplet_counts()
             
             #prepare the triplet counts text
             triplet_text = f"Triplets - O: {O_triplets} | X: {X_triplets}"
-            text = font.render(triplet_text, True, self.WHITE)
+            text = self.score_font.render(triplet_text, True, self.WHITE)
             text_rect = text.get_rect(center=(self.width / 2, self.height - 20))  #position at bottom of screen
+            self.redraw_area((0, text_rect.top, self.width, self.height - text_rect.top)) #clear the previous counts
             self.screen.blit(text, text_rect)
 
     def animate_move(self, row, col, symbol):#animate player move on the grid
@@ -331,21 +421,21 @@ class TicTacToeGame:
         cell_size = self.width / grid_size
         x = col * cell_size
         y = row * cell_size
-
+        #each frame only repaints the animated cell, the symbol is already in board_state so start from the empty cell
+        cell = self.cell_rect(row, col)
+        empty_cell = self.board_surface().subsurface(cell.clip(self.screen.get_rect()))
 
         if symbol == 'O':#animate 'O' symbol
             center = (x + cell_size / 2, y + cell_size / 2)
             radius = cell_size / 3
             for r in range(0, int(radius), 5):
-                self.draw_board()
-                self.draw_symbols()
+                self.screen.blit(empty_cell, cell)
                 pygame.draw.circle(self.screen, self.CIRCLE_COLOR, center, r, 5)
-                pygame.display.update()
+                pygame.display.update(cell)
                 pygame.time.delay(20)
         elif symbol == 'X':#animate 'X' symbol
             for i in range(0, int(cell_size / 2), 5):
-                self.draw_board()
-                self.draw_symbols()
+                self.screen.blit(empty_cell, cell)
                 start_pos1 = (x + i, y + i)
                 end_pos1 = (x + cell_size - i, y + cell_size - i)
                 pygame.draw.line(self.screen, self.CROSS_COLOR, start_pos1, end_pos1, 5)
@@ -353,7 +443,7 @@ class TicTacToeGame:
                 start_pos2 = (x + cell_size - i, y + i)
                 end_pos2 = (x + i, y + cell_size - i)
                 pygame.draw.line(self.screen, self.CROSS_COLOR, start_pos2, end_pos2, 5)
-                pygame.display.update()
+                pygame.display.update(cell)
                 pygame.time.delay(20)
 
     def main_loop(self):
@@ -363,7 +453,7 @@ class TicTacToeGame:
         self.draw_board()
         self.draw_symbols()
         self.display_score()
-        pygame.display.update()
+        self.flush_display()
         
         while True:
             self.clock.tick(30)
@@ -378,18 +468,36 @@ class TicTacToeGame:
 
             #Handle AI move during player v computer and AI turn
             if not self.game_over and self.game_mode == 'Player vs Computer' and current_symbol == self.ai_symbol:
-                # AI's turn
-                self.ai_move(current_symbol)
-                self.check_game_over()
-                if self.game_over:
-                    continue  # skip to next loop iteration
+                # AI's turn, search in the background and poll for the result every frame
+                if self.ai_future is None:
+                    self.start_ai_move()
+                elif self.ai_future.done():
+                    self.ai_move(current_symbol)
+                    self.check_game_over()
+                    if self.game_over:
+                        continue  # skip to next loop iteration
+                else:
+                    self.draw_thinking_indicator()
+            elif self.pondering and not self.game_over and self.game_mode == 'Player vs Computer' and self.ponder_move is None:
+                self.start_pondering()
 
             #event handling loop
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.cancel_ai_move()
+                    self.ai_executor.shutdown(wait=False)
+                    shutdown_process_pool()
+                    self.game_log.close()
                     pygame.quit()
                     sys.exit()
-                
+
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:#abandon the game and go back to the menu
+                    self.cancel_ai_move()
+                    self.game_log.record('game_abandoned', game=self.game_id, moves=self.game_moves)
+                    self.switch_to_ui_music()
+                    self.main_menu()
+                    return
+
                 if event.type == pygame.MOUSEBUTTONDOWN and not self.game_over:
                     pos = pygame.mouse.get_pos()
                     grid_size = self.GRID_SIZE
@@ -403,28 +511,14 @@ class TicTacToeGame:
                         if self.game_mode == 'Player vs Computer' and current_symbol != self.player_symbol:
                             continue  #not player turn, ignore click
                         self.player_move(row, col, current_symbol)
+                        if self.ponder_move is not None:
+                            self.resolve_ponder((row, col))
                         self.check_game_over()
                         if self.game_over:
                             break
             
-            pygame.display.update()
+            self.flush_display()
     
-    def format_board(self, board):#format board state for logging
-        size = board.shape[0]
-        board_str = ''
-        for i in range(size):
-            row = ''
-            for j in range(size):
-                cell = board[i, j]
-                if cell == 1:
-                    row += 'O '
-                elif cell == -1:
-                    row += 'X '
-                else:
-                    row += '. '
-            board_str += row.strip() + '\n'
-        return board_str.strip()
-
     def player_move(self, row, col, current_symbol):
         """
         handle players move, place symbol and update game state
@@ -432,63 +526,132 @@ class TicTacToeGame:
         self.board_state[row, col] = 1 if current_symbol == 'O' else -1
         self.game_state = self.game_state.get_new_state((row, col))
         self.animate_move(row, col, current_symbol)
-        self.draw_symbols()
+        self.draw_cell(row, col)
         self.display_score()
-        pygame.display.update()
+        self.flush_display()
 
         #log the move
-        logging.info(f"Player '{current_symbol}' placed at position ({row}, {col}).")
-        logging.info(f"**Board state after the move:**\n```\n{self.format_board(self.board_state)}\n```\n")
+        self.game_moves.append([row, col])
+        self.game_log.record('move', game=self.game_id, ply=len(self.game_moves), symbol=current_symbol, by='player', move=[row, col])
+
+    def start_ai_move(self):#start searching the AI's move in the background thread
+        self.ai_cancel = threading.Event()
+        #check for cancellation every few hundred nodes
+        stats = SearchStats(hooks=self.search_hooks + [cancel_hook(self.ai_cancel)], sample_every=256)
+        #the search gets its own copy, the main loop keeps reading self.game_state meanwhile
+        self.ai_future = self.ai_executor.submit(self.search_ai_move, self.game_state.copy(), stats)
+
+    def cancel_ai_move(self):#stop a running search or ponder search and drop its result
+        if self.ai_future is not None:
+            self.ai_cancel.set()
+            self.ai_future.cancel() #in case it has not started yet
+            self.ai_future = None
+        if self.ponder_future is not None:
+            self.ponder_cancel.set()
+            self.ponder_future.cancel()
+            self.ponder_future = None
+        self.ponder_move = None
+
+    def start_pondering(self):#on the player's turn, start searching the AI's reply to the player's expected move
+        game_state = self.game_state.copy()
+        #the last AI search usually left the player's best reply in the transposition table
+        self.ponder_move = tt_best_move(game_state, self.transposition_table) or game_state.get_moves()[0]
+        game_state.make_move(self.ponder_move)
+        #the parallel search only notices cancellation between iterations, too late to hand over a ponder hit
+        if game_state.is_terminal() or self.algorithm == 'parallel':
+            return
+        self.ponder_cancel = threading.Event()
+        stats = SearchStats(hooks=self.search_hooks + [cancel_hook(self.ponder_cancel)], sample_every=256)
+        self.ponder_started = time.perf_counter()
+        self.ponder_future = self.ai_executor.submit(self.search_ai_move, game_state, stats, self.ponder_time_budget_ms, True)
+
+    def resolve_ponder(self, move):#the player moved: keep the ponder search if it was the expected move, drop it otherwise
+        if self.ponder_future is not None and tuple(move) == tuple(self.ponder_move):
+            #ponder hit, the running search becomes the AI's search and stops once the normal budget is used up
+            remaining = self.ai_time_budget_ms / 1000 - (time.perf_counter() - self.ponder_started)
+            if remaining > 0:
+                timer = threading.Timer(remaining, self.ponder_cancel.set)
+                timer.daemon = True
+                timer.start()
+            else:
+                self.ponder_cancel.set()
+            self.ai_future, self.ai_cancel = self.ponder_future, self.ponder_cancel
+            self.game_log.record('ponder_hit', game=self.game_id, move=[int(move[0]), int(move[1])])
+        elif self.ponder_future is not None:
+            self.ponder_cancel.set()
+            self.ponder_future.cancel()
+        self.ponder_future = None
+        self.ponder_move = None
+
+    def search_ai_move(self, game_state, stats, time_budget_ms=None, ponder=False):
+        """
+        Choose the AI's move based on the selected algorithm, runs in the background thread.
+        Returns (score, move, depth, stats, transposition table stats). time_budget_ms defaults to ai_time_budget_ms.
+        ponder=True for the search started on the player's turn, which keeps the move ordering of the last AI move.
+        """
+        # Choose the algorithm based on the player's selection, default to minimax
+        algorithm = self.algorithm if self.algorithm in ('negamax', 'parallel', 'pvs', 'mcts') else 'minimax'
+
+        book_entry = self.opening_book.lookup(game_state) if self.opening_book is not None else None
+        if book_entry is not None:
+            # Known position, play the precomputed move
+            score, move = book_entry
+            return score, move, 'opening book', stats, None
+        if time_budget_ms is None:
+            time_budget_ms = self.ai_time_budget_ms
+        if algorithm == 'mcts' and self.GRID_SIZE > 3:#3x3 ends at the first triplet, which the playouts do not model
+            score, move = self.mcts_tree.search(game_state, time_budget_ms, stats=stats)
+            return score, move, self.mcts_tree.max_depth, stats, None
+        # Search deeper and deeper until the per-move time budget runs out
+        if not ponder:#age once per AI move, not again for the ponder search in between
+            self.move_ordering.age()
+        score, move, depth = iterative_deepening(game_state, time_budget_ms, algorithm, tt=self.transposition_table, workers=self.ai_workers, stats=stats, ordering=self.move_ordering)
+        #table stats scan every slot, do it here rather than in the game loop
+        return score, move, depth, stats, self.transposition_table.stats()
+
+    def draw_thinking_indicator(self):#animated 'AI thinking...' banner while the search runs
+        if self.thinking_font is None:
+            self.thinking_font = pygame.font.Font(None, 36)
+        dots = '.' * (pygame.time.get_ticks() // 400 % 4)
+        text = self.thinking_font.render(f"AI thinking{dots}", True, self.NEON_GREEN)
+        banner = pygame.Rect(0, 0, 200, 36)
+        banner.center = (self.width / 2, 24)
+        pygame.draw.rect(self.screen, self.BACKGROUND_COLOR, banner, border_radius=8)
+        self.screen.blit(text, text.get_rect(midleft=(banner.left + 20, banner.centery)))
+        self.mark_dirty(banner)
+        self.thinking_banner = banner
+
+    def clear_thinking_indicator(self):
+        if self.thinking_banner is not None:
+            self.redraw_area(self.thinking_banner)
+            self.thinking_banner = None
 
     def ai_move(self, current_symbol):
         """
-        Handle AI's move based on the selected algorithm
+        Play the move found by the finished background search
         """
-        empty_cells = np.count_nonzero(self.board_state == 0)
-        total_cells = self.GRID_SIZE * self.GRID_SIZE
-        game_progress = (total_cells - empty_cells) / total_cells
-
-        # Adjust depth based on grid size
-        if self.GRID_SIZE <= 4:
-            max_depth = 6
-        else:
-            max_depth = 2  # For 7x7 and larger grids
+        score, move, depth, stats, tt_stats = self.ai_future.result()
+        self.ai_future = None
 
-        # Adjust depth based on game progression
-        if game_progress < 0.75:
-            depth = max_depth - 1
+        if not move:#no move to play, e.g. the search was cancelled on a finished game, still take the banner down
+            self.clear_thinking_indicator()
+            self.flush_display()
         else:
-            depth = max_depth
-        
-        #set color based on AI's symbol
-        color = 1 if self.ai_symbol == 'O' else -1
-
-        # Choose the algorithm based on the player's selection
-        if self.algorithm == 'minimax':
-            is_maximizing = self.ai_symbol == 'O'
-            score, move = minimax(self.game_state, depth, is_maximizing)
-        elif self.algorithm == 'negamax':
-            color = 1 if self.ai_symbol == 'O' else -1
-            score, move = negamax(self.game_state, depth, color)
-        else:
-        # Default to minimax
-            is_maximizing = self.ai_symbol == 'O'
-            score, move = minimax(self.game_state, depth, True)
-
-        if move:
             row, col = move
             self.board_state[row, col] = 1 if current_symbol == 'O' else -1
             self.game_state = self.game_state.get_new_state((row, col))
+            self.clear_thinking_indicator()
             self.animate_move(row, col, current_symbol)
-            self.draw_symbols()
+            self.draw_cell(row, col)
             self.display_score()
-            pygame.display.update()
+            self.flush_display()
 
             #log AI's move
-            logging.info(f"AI '{current_symbol}' placed at position ({row}, {col}).")
-            logging.info(f"Algorithm used: {self.algorithm.capitalize()}")  # Log the algorithm used
-            logging.info(f"AI evaluated move with score: {score}")
-            logging.info(f"**Board state after AI's move:**\n```\n{self.format_board(self.board_state)}\n```\n")
+            row, col = int(row), int(col)
+            self.game_moves.append([row, col])
+            self.game_log.record('move', game=self.game_id, ply=len(self.game_moves), symbol=current_symbol, by='ai', move=[row, col],
+                                 algorithm=self.algorithm, score=score if score is None or isinstance(score, float) else int(score), depth=depth,
+                                 stats=stats.as_dict(), transposition_table=tt_stats)
 
             
 if __name__ == '__main__':#start the game
@@ -0,0 +1,48 @@
+#move_ordering.py
+
+class MoveOrdering:
+    """
+    What the search learned about good moves, used to order children before get_moves()' static sort:
+    killer moves (recent cutoff moves per ply, searched right after the hash move) and a history table of
+    cutoff counts per (cell, side), weighted by remaining depth. One instance per search or per game.
+    """
+    KILLER_SLOTS = 2
+
+    def __init__(self):
+        self.killers = [] #killers[ply] = up to KILLER_SLOTS moves, most recent first
+        self.history = {} #(move, turn_O) -> sum of depth * depth over the cutoffs it caused
+
+    def order(self, moves, ply, turn_O, first_move=None):#return moves reordered: hash move, killers, then by history
+        history = self.history
+        if history:
+            #stable sort, so moves without history keep the static order from get_moves()
+            moves = sorted(moves, key=lambda move: -history.get((move, turn_O), 0))
+        front = [first_move] if first_move is not None else []
+        if ply < len(self.killers):
+            front += [killer for killer in self.killers[ply] if killer != first_move]
+        front = [move for move in front if move in moves]
+        if front:
+            moves = front + [move for move in moves if move not in front]
+        return moves
+
+    def killer_moves(self, ply):#killers recorded at ply, most recent first
+        return self.killers[ply] if ply < len(self.killers) else []
+
+    def cutoff(self, move, ply, turn_O, depth):#record a move that caused a beta cutoff with depth plies left
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        slots = self.killers[ply]
+        if move in slots:
+            slots.remove(move)
+        slots.insert(0, move)
+        del slots[self.KILLER_SLOTS:]
+        key = (move, turn_O)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+    def age(self):#call between moves of a game: killers are per ply from the old root, older history counts half
+        self.killers = []
+        self.history = {key: value // 2 for key, value in self.history.items() if value > 1}
+
+    def clear(self):
+        self.killers = []
+        self.history = {}
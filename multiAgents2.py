@@ -1,66 +1,261 @@
 #multiAgents2.py
 from GameStatus_51202 import GameStatus
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+from search_stats import SearchStats
+from move_ordering import MoveOrdering
+from board_geometry import geometry
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import multiprocessing
 import logging
+import os
+import time
+import numpy as np
+
+#half-width of the pvs() window around the previous iteration's score in iterative_deepening(), None = full window.
+#Off by default: the evaluation swings between odd and even depths, so narrow windows mostly fail and re-search.
+ASPIRATION_WINDOW = None
+
+#how many forcing moves (threats, blocks and completed triplets) threat_search() plays past the depth limit, 0 = static leaves.
+#Off by default: at equal time per move it costs as much search depth as it gains, see benchmark.py --threat-plies.
+THREAT_EXTENSION_PLIES = 0
+
+class SearchTimeout(Exception):#raised inside a search when its deadline has passed
+    pass
+
+def cancel_hook(cancel_event):#SearchStats hook that stops the search like a timeout once cancel_event (a threading.Event) is set
+    def hook(event, stats):
+        if event == 'sample' and cancel_event.is_set():
+            raise SearchTimeout()
+    return hook
+
+def tt_best_move(game_state, tt):#best move stored in tt for the position, or None
+    key, symmetry = game_state.canonical_key()
+    entry = tt.probe(key)
+    if entry is None or entry[4] is None:
+        return None
+    return game_state.from_canonical(entry[4], symmetry)
+
+def _order_moves(moves, first_move):#move the hash move to the front so it is searched first
+    if first_move is not None and first_move in moves:
+        moves.remove(first_move)
+        moves.insert(0, first_move)
+    return moves
+
+def _generate_moves(game_state, first_move, stats, ordering=None, ply=0):#ordered child moves, timed when stats are collected
+    if stats is not None:
+        started = time.perf_counter()
+    moves = game_state.get_moves()
+    if ordering is not None:
+        moves = ordering.order(moves, ply, game_state.turn_O, first_move)
+    else:
+        moves = _order_moves(moves, first_move)
+    if stats is not None:
+        stats.move_gen_time += time.perf_counter() - started
+    return moves
+
+def _probe_tt(tt, game_state, depth, alpha, beta):
+    """
+    Look the position up in tt, shared by all 8 orientations of the board. Returns (key, symmetry, hash move,
+    alpha, beta, value): value is not None when the stored result settles the node, otherwise alpha and beta
+    are narrowed by the stored bound.
+    """
+    key, symmetry = game_state.canonical_key()
+    entry = tt.probe(key)
+    if entry is None:
+        return key, symmetry, None, alpha, beta, None
+    _, entry_depth, flag, value, tt_move = entry
+    if tt_move is not None:
+        tt_move = game_state.from_canonical(tt_move, symmetry)
+    if entry_depth >= depth:
+        if flag == EXACT:
+            return key, symmetry, tt_move, alpha, beta, value
+        elif flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return key, symmetry, tt_move, alpha, beta, value
+    return key, symmetry, tt_move, alpha, beta, None
+
+def _store_tt(tt, game_state, key, symmetry, depth, value, alpha_orig, beta_orig, best_move):#store a searched node, classified by the window (alpha_orig, beta_orig) it was searched with
+    flag = UPPER if value <= alpha_orig else LOWER if value >= beta_orig else EXACT
+    tt.store(key, depth, flag, value, game_state.to_canonical(best_move, symmetry))
+
+def _staged_moves(game_state, first_move, stats, ordering=None, ply=0):
+    """
+    Child moves for the search loops, generated lazily in stages so that a cutoff skips the later ones: the hash
+    move, then the killers of this ply, then everything else in _generate_moves() order. Each move is yielded once.
+    """
+    tried = set()
+    killers = ordering.killer_moves(ply) if ordering is not None else []
+    for move in itertools.chain([first_move] if first_move is not None else [], killers):
+        if move not in tried and game_state.is_empty(move):
+            tried.add(move)
+            yield move
+    for move in _generate_moves(game_state, None, stats, ordering, ply):
+        if move not in tried:
+            yield move
+
+def _leaf_score(game_state, stats):#get_scores() of a terminal or depth-limit position, timed when stats are collected
+    if stats is None:
+        return game_state.get_scores()
+    started = time.perf_counter()
+    score = game_state.get_scores()
+    stats.eval_time += time.perf_counter() - started
+    stats.leaf_evaluations += 1
+    return score
+
+def threat_search(game_state, color, alpha=float('-inf'), beta=float('inf'), plies=None, deadline=None, stats=None, ply=0):
+    """
+    Quiescence search run at the depth limit, following forcing moves only, up to plies moves deep. While the
+    opponent threatens to complete a triplet the side to move must block it (or complete one of its own),
+    otherwise it stands on the static score, completes a triplet or makes a new two-in-a-window threat.
+    Scores from the side to move's view, like negamax().
+    """
+    if plies is None:
+        plies = THREAT_EXTENSION_PLIES
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
+    if stats is not None and ply > 0:#the position at the depth limit was already counted by the search calling us
+        stats.node(-ply) #negative remaining depth, so max_ply includes the extension
+    static = color * _leaf_score(game_state, stats)
+    if plies <= 0 or game_state.is_terminal():
+        return static
+    symbol = 1 if game_state.turn_O else -1
+    completions = game_state.threat_cells(symbol)
+    blocks = game_state.threat_cells(-symbol)
+    if blocks:#standing on the static score would ignore the threat
+        best = float('-inf')
+        moves = completions + [idx for idx in blocks if idx not in completions]
+    else:
+        best = static
+        if best >= beta:
+            return best
+        alpha = max(alpha, best)
+        moves = completions + [idx for idx in game_state.threat_making_cells(symbol) if idx not in completions]
+    size = game_state.grid_size
+    for idx in moves:
+        move = divmod(idx, size)
+        game_state.make_move(move)
+        try:
+            score = -threat_search(game_state, -color, -beta, -alpha, plies - 1, deadline, stats, ply + 1)
+        finally:
+            game_state.unmake_move(move)
+        if score > best:
+            best = score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+    return best
+
+def minimax(game_state: GameStatus, depth: int, maximizingPlayer: bool, alpha=float('-inf'), beta=float('inf'), tt=None, deadline=None, stats=None, ordering=None, ply=0):#minimax algorithm
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
+    if stats is not None:
+        stats.node(depth)
+    tt_move = None
+    if tt is not None:
+        tt_key, symmetry, tt_move, alpha, beta, value = _probe_tt(tt, game_state, depth, alpha, beta)
+        if value is not None:
+            return value, tt_move
+    alpha_orig, beta_orig = alpha, beta #window actually searched, used to classify the stored value
 
-def minimax(game_state: GameStatus, depth: int, maximizingPlayer: bool, alpha=float('-inf'), beta=float('inf')):#minimax algorithm
     terminal = game_state.is_terminal()
 
     if terminal:#if game over
-        score = game_state.get_scores()
+        score = _leaf_score(game_state, stats)
         return score, None #return score when game over
     
-    if (depth == 0):#if depth limit reached
-        score = game_state.get_scores()
+    if (depth == 0):#if depth limit reached, play out the forcing moves
+        if game_state.turn_O:#O maximizes
+            score = threat_search(game_state, 1, alpha, beta, deadline=deadline, stats=stats)
+        else:
+            score = -threat_search(game_state, -1, -beta, -alpha, deadline=deadline, stats=stats)
         return score, None
 
     if maximizingPlayer:#maximizing player
         maxEval = float('-inf')
         best_move = None
-        for move in game_state.get_moves():
-            child_state = game_state.get_new_state(move)
-            eval_score, _ = minimax(child_state, depth - 1, False, alpha, beta)
+        for index, move in enumerate(_staged_moves(game_state, tt_move, stats, ordering, ply)):
+            game_state.make_move(move) #search the child in place, unmade even when the search times out
+            try:
+                eval_score, _ = minimax(game_state, depth - 1, False, alpha, beta, tt, deadline, stats, ordering, ply + 1)
+            finally:
+                game_state.unmake_move(move)
             if eval_score > maxEval:
                 maxEval = eval_score
                 best_move = move
             alpha = max(alpha, eval_score)
             if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(index)
+                if ordering is not None:
+                    ordering.cutoff(move, ply, game_state.turn_O, depth)
                 break  #alpha-beta pruning
         #log the decision at this level
-        logging.debug(f"Maximizing player evaluated move {best_move} with score {maxEval} at depth {depth}")    
+        logging.debug("Maximizing player evaluated move %s with score %s at depth %s", best_move, maxEval, depth)
+        if tt is not None:
+            _store_tt(tt, game_state, tt_key, symmetry, depth, maxEval, alpha_orig, beta_orig, best_move)
         return maxEval, best_move
     else:
         minEval = float('inf')
         best_move = None
-        for move in game_state.get_moves():
-            child_state = game_state.get_new_state(move)
-            eval_score, _ = minimax(child_state, depth - 1, True, alpha, beta)
+        for index, move in enumerate(_staged_moves(game_state, tt_move, stats, ordering, ply)):
+            game_state.make_move(move) #search the child in place, unmade even when the search times out
+            try:
+                eval_score, _ = minimax(game_state, depth - 1, True, alpha, beta, tt, deadline, stats, ordering, ply + 1)
+            finally:
+                game_state.unmake_move(move)
             if eval_score < minEval:
                 minEval = eval_score
                 best_move = move
             beta = min(beta, eval_score)
             if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(index)
+                if ordering is not None:
+                    ordering.cutoff(move, ply, game_state.turn_O, depth)
                 break  # Alpha-beta pruning
         #log the decision at this level
-        logging.debug(f"Minimizing player evaluated move {best_move} with score {minEval} at depth {depth}")
+        logging.debug("Minimizing player evaluated move %s with score %s at depth %s", best_move, minEval, depth)
+        if tt is not None:
+            _store_tt(tt, game_state, tt_key, symmetry, depth, minEval, alpha_orig, beta_orig, best_move)
         return minEval, best_move
 
-def negamax(game_state: GameStatus, depth: int, color, alpha=float('-inf'), beta=float('inf')):#negamax algorithm
+def negamax(game_state: GameStatus, depth: int, color, alpha=float('-inf'), beta=float('inf'), tt=None, deadline=None, stats=None, ordering=None, ply=0):#negamax algorithm
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
+    if stats is not None:
+        stats.node(depth)
+    tt_move = None
+    if tt is not None:
+        tt_key, symmetry, tt_move, alpha, beta, value = _probe_tt(tt, game_state, depth, alpha, beta)
+        if value is not None:
+            return value, tt_move
+    alpha_orig, beta_orig = alpha, beta #window actually searched, used to classify the stored value
+
     terminal = game_state.is_terminal()
-    if depth == 0 or terminal:
-        score = color * game_state.get_scores()
+    if terminal:
+        score = color * _leaf_score(game_state, stats)
         return score, None
+    if depth == 0:#play out the forcing moves past the depth limit
+        return threat_search(game_state, color, alpha, beta, deadline=deadline, stats=stats), None
     
     max_value = float('-inf')#initialize max value
     best_move = None#initialize best move
 
-    for move in game_state.get_moves():#get all possible moves
-        child_state = game_state.get_new_state(move)
-        # Alternate the player
-        eval_score, _ = negamax(child_state, depth - 1, -color, -beta, -alpha)
+    for index, move in enumerate(_staged_moves(game_state, tt_move, stats, ordering, ply)):#get all possible moves
+        game_state.make_move(move) #search the child in place, unmade even when the search times out
+        try:
+            # Alternate the player
+            eval_score, _ = negamax(game_state, depth - 1, -color, -beta, -alpha, tt, deadline, stats, ordering, ply + 1)
+        finally:
+            game_state.unmake_move(move)
         eval_score = -eval_score  # Negate the score after recursive call
 
         # Log the evaluation of this move
-        logging.debug(f"Evaluated move {move} with score {eval_score} at depth {depth}.")
+        logging.debug("Evaluated move %s with score %s at depth %s.", move, eval_score, depth)
 
         if eval_score > max_value:#update max value
             max_value = eval_score
@@ -69,7 +264,409 @@ def negamax(game_state: GameStatus, depth: int, color, alpha=float('-inf'), beta
         alpha = max(alpha, eval_score)#update alpha
         if alpha >= beta:
             # Log alpha-beta pruning
-            logging.debug(f"Alpha-beta pruning at move {move} with alpha {alpha} and beta {beta}.")
+            logging.debug("Alpha-beta pruning at move %s with alpha %s and beta %s.", move, alpha, beta)
+            if stats is not None:
+                stats.cutoff(index)
+            if ordering is not None:
+                ordering.cutoff(move, ply, game_state.turn_O, depth)
+            break
+
+    if tt is not None:
+        _store_tt(tt, game_state, tt_key, symmetry, depth, max_value, alpha_orig, beta_orig, best_move)
+    return max_value, best_move
+
+def pvs(game_state: GameStatus, depth: int, color, alpha=float('-inf'), beta=float('inf'), tt=None, deadline=None, stats=None, ordering=None, ply=0):
+    """
+    Principal variation search (NegaScout): negamax() that searches the first child with the full window and
+    the rest with a null window around alpha, re-searching only the ones that turn out better. Same value and
+    move as negamax(), scores from the side to move's view.
+    """
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
+    if stats is not None:
+        stats.node(depth)
+    tt_move = None
+    if tt is not None:
+        tt_key, symmetry, tt_move, alpha, beta, value = _probe_tt(tt, game_state, depth, alpha, beta)
+        if value is not None:
+            return value, tt_move
+    alpha_orig, beta_orig = alpha, beta #window actually searched, used to classify the stored value
+
+    if game_state.is_terminal():
+        return color * _leaf_score(game_state, stats), None
+    if depth == 0:
+        return threat_search(game_state, color, alpha, beta, deadline=deadline, stats=stats), None
+
+    max_value = float('-inf')
+    best_move = None
+    for index, move in enumerate(_staged_moves(game_state, tt_move, stats, ordering, ply)):
+        game_state.make_move(move) #search the child in place, unmade even when the search times out
+        try:
+            if index == 0:
+                eval_score, _ = pvs(game_state, depth - 1, -color, -beta, -alpha, tt, deadline, stats, ordering, ply + 1)
+                eval_score = -eval_score
+            else:
+                #scores are integers, so (alpha, alpha + 1) is a null window: it only tells whether the move beats alpha
+                eval_score, _ = pvs(game_state, depth - 1, -color, -alpha - 1, -alpha, tt, deadline, stats, ordering, ply + 1)
+                eval_score = -eval_score
+                if alpha < eval_score < beta:#better than the principal variation, search again for the exact value
+                    eval_score, _ = pvs(game_state, depth - 1, -color, -beta, -alpha, tt, deadline, stats, ordering, ply + 1)
+                    eval_score = -eval_score
+        finally:
+            game_state.unmake_move(move)
+
+        if eval_score > max_value:
+            max_value = eval_score
+            best_move = move
+        alpha = max(alpha, eval_score)
+        if alpha >= beta:
+            if stats is not None:
+                stats.cutoff(index)
+            if ordering is not None:
+                ordering.cutoff(move, ply, game_state.turn_O, depth)
             break
 
+    if tt is not None:
+        _store_tt(tt, game_state, tt_key, symmetry, depth, max_value, alpha_orig, beta_orig, best_move)
     return max_value, best_move
+
+def _aspiration_search(game_state, depth, color, guess, window, tt, deadline, stats, ordering):#pvs() in a window around guess, widened on failure
+    if guess is None or window is None:
+        return pvs(game_state, depth, color, tt=tt, deadline=deadline, stats=stats, ordering=ordering)
+    alpha, beta = guess - window, guess + window
+    while True:
+        score, move = pvs(game_state, depth, color, alpha, beta, tt, deadline, stats, ordering)
+        if score <= alpha:#failed low, the value is somewhere below
+            alpha = float('-inf')
+        elif score >= beta:#failed high
+            beta = float('inf')
+        else:
+            return score, move
+
+_pool = None #process pool for parallel_root_search(), created on first use
+_pool_workers = 0
+_pool_bound = None #best root score found so far, shared with the workers
+
+_worker_bound = None #the pool's shared bound, as seen inside a worker
+_BOUND_CHECK_EVERY = 256 #nodes between two reads of the shared bound inside a worker
+_worker_tts = {} #each worker keeps one transposition table per (algorithm, grid size) warm between tasks
+_worker_orderings = {} #and one MoveOrdering per (algorithm, grid size), killers from another grid size are off the board
+
+class _BoundRaised(Exception):#raised inside a worker's search when another worker has raised the shared bound
+    pass
+
+def _bound_hook(bound):#SearchStats hook that stops the search once the shared bound is above the one it was started with
+    def hook(event, stats):
+        if event == 'sample' and _worker_bound.value - 1 > bound:
+            raise _BoundRaised()
+    return hook
+
+def _init_worker(shared_bound):
+    global _worker_bound
+    _worker_bound = shared_bound
+
+def get_process_pool(workers=None):#return the shared process pool, recreating it if the worker count changed
+    global _pool, _pool_workers, _pool_bound
+    workers = workers or os.cpu_count() or 1
+    if _pool is None or _pool_workers != workers:
+        shutdown_process_pool()
+        _pool_bound = multiprocessing.Value('d', float('-inf'))
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(_pool_bound,))
+        _pool_workers = workers
+    return _pool
+
+def shutdown_process_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def _search_root_move(game_state, move, depth, algorithm, deadline):#worker task: (score of one root move from the root player's view, SearchStats)
+    child_state = game_state.get_new_state(move)
+    stats = SearchStats(sample_every=_BOUND_CHECK_EVERY)
+    cache_key = (algorithm, game_state.grid_size)
+    tt = _worker_tts.setdefault(cache_key, TranspositionTable()) #minimax and negamax store scores differently
+    ordering = _worker_orderings.setdefault(cache_key, MoveOrdering())
+    sign = 1 if game_state.turn_O else -1
+    while True:
+        #scores are integers, so searching just below the best score so far still returns ties exactly
+        bound = _worker_bound.value - 1
+        stats.hooks = [_bound_hook(bound)]
+        try:
+            if algorithm == 'negamax':
+                eval_score, _ = negamax(child_state, depth - 1, -sign, float('-inf'), -bound, tt, deadline, stats, ordering, 1)
+                score = -eval_score
+            elif game_state.turn_O:
+                score, _ = minimax(child_state, depth - 1, False, bound, float('inf'), tt, deadline, stats, ordering, 1)
+            else:
+                eval_score, _ = minimax(child_state, depth - 1, True, float('-inf'), -bound, tt, deadline, stats, ordering, 1)
+                score = -eval_score
+            break
+        except _BoundRaised:#another root move did better meanwhile, search again in the narrower window
+            continue
+    with _worker_bound.get_lock():
+        if score > _worker_bound.value:
+            _worker_bound.value = score
+    return score, stats
+
+def parallel_root_search(game_state: GameStatus, depth: int, algorithm='negamax', workers=None, first_move=None, deadline=None, stats=None):
+    """
+    Split the root moves of a negamax() or minimax() search across a process pool and return (score, move).
+    Workers share the best root score so far as their alpha bound and restart a running search in the narrower
+    window when another worker raises it; ties go to the earliest move in get_moves() order, so the result
+    matches the sequential search. Scores are from the side to move's view for negamax.
+    """
+    if stats is not None:
+        stats.node(depth)
+    if depth == 0 or game_state.is_terminal():
+        score = game_state.get_scores()
+        return (score if algorithm != 'negamax' or game_state.turn_O else -score), None
+
+    moves = _generate_moves(game_state, first_move, stats)
+    pool = get_process_pool(workers)
+    _pool_bound.value = float('-inf')
+    futures = [pool.submit(_search_root_move, game_state, move, depth, algorithm, deadline) for move in moves]
+    try:
+        results = [future.result() for future in futures]
+    except SearchTimeout:
+        for future in futures:
+            future.cancel()
+        raise
+
+    scores = [score for score, _ in results]
+    if stats is not None:
+        for _, worker_stats in results:
+            stats.merge(worker_stats)
+    best_index = max(range(len(moves)), key=lambda i: (scores[i], -i))
+    best_score = scores[best_index]
+    if algorithm != 'negamax' and not game_state.turn_O:
+        best_score = -best_score #minimax reports X's best as the minimum
+    return best_score, moves[best_index]
+
+def iterative_deepening(game_state: GameStatus, time_budget_ms, algorithm='negamax', max_depth=None, tt=None, workers=None, stats=None, ordering=None, aspiration_window=ASPIRATION_WINDOW):
+    """
+    Search depth 1, 2, 3... until time_budget_ms runs out and return (score, move, depth) from the last completed iteration.
+    Depth 1 ignores the time budget; if a stats hook cancels it anyway, the first move in get_moves() order is
+    returned as (None, move, 0), so there is always a move unless the game is over.
+    The transposition table carries each iteration's principal variation into the next one's move ordering,
+    the killer moves and history in ordering carry the cutoffs. With algorithm='pvs' each iteration searches a
+    window of +-aspiration_window around the previous score first (None for the full window).
+    """
+    if tt is None:
+        tt = TranspositionTable()
+    if ordering is None:
+        ordering = MoveOrdering()
+    if max_depth is None:
+        max_depth = int((game_state.board_state == 0).sum()) #never search past a full board
+    deadline = time.perf_counter() + time_budget_ms / 1000.0
+    color = 1 if game_state.turn_O else -1
+
+    if stats is not None:
+        stats.start()
+    best = (None, None, 0)
+    for depth in range(1, max(1, max_depth) + 1):
+        #depth 1 runs to completion unless a stats hook cancels it, so there is a move to return
+        iteration_deadline = None if depth == 1 else deadline
+        try:
+            if algorithm == 'parallel':
+                score, move = parallel_root_search(game_state, depth, 'negamax', workers, best[1], iteration_deadline, stats)
+            elif algorithm == 'pvs':
+                score, move = _aspiration_search(game_state, depth, color, best[0], aspiration_window, tt, iteration_deadline, stats, ordering)
+            elif algorithm == 'negamax':
+                score, move = negamax(game_state, depth, color, tt=tt, deadline=iteration_deadline, stats=stats, ordering=ordering)
+            else:
+                score, move = minimax(game_state, depth, game_state.turn_O, tt=tt, deadline=iteration_deadline, stats=stats, ordering=ordering)
+        except SearchTimeout:
+            logging.debug("Iterative deepening stopped during depth %s.", depth)
+            if best[1] is None and not game_state.is_terminal():#cancelled before any iteration finished
+                best = (None, game_state.get_moves()[0], 0)
+            break
+        best = (score, move, depth)
+        if time.perf_counter() >= deadline:
+            break
+    if stats is not None:
+        stats.stop()
+    return best
+
+class MCTS:
+    """
+    Monte Carlo tree search (UCT) for grids larger than 3x3, where the game is decided by the triplet counts of
+    the full board. Nodes live in a pool of flat arrays, the children of a node are one contiguous block
+    ordered by positional weight. Each expanded leaf is scored by a batch of random playouts to the full board
+    done with NumPy, biased towards central cells. Keep one instance per game: search() reuses the subtree of
+    the new position when it follows from the previous root.
+    """
+    def __init__(self, exploration=1.4, playouts_per_leaf=8, bias=1.0, capacity=1 << 14, seed=None):
+        self.exploration = exploration
+        self.playouts_per_leaf = playouts_per_leaf
+        self.bias = bias #0 = uniform playouts, higher = central cells are filled first more often
+        self.rng = np.random.default_rng(seed)
+        self.capacity = capacity
+        self.root_board = None #flat board and side to move (1 = O, -1 = X) at the root
+        self.root_turn = None
+        self.max_depth = 0 #deepest tree level reached by the last search
+        self.iterations = 0 #iterations run by the last search
+        self._reset()
+
+    def _reset(self):
+        capacity = self.capacity
+        self.move = np.zeros(capacity, dtype=np.int16) #cell index played to reach the node
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.n_children = np.zeros(capacity, dtype=np.int16) #0 = not expanded yet
+        self.visits = np.zeros(capacity, dtype=np.float64) #playouts through the node
+        self.value = np.zeros(capacity, dtype=np.float64) #sum of their results for the player who moved into the node
+        self.size = 1 #nodes in use, node 0 is the root
+
+    def _grow(self, needed):#make room for needed more nodes
+        if self.size + needed <= len(self.visits):
+            return
+        capacity = max(2 * len(self.visits), self.size + needed)
+        for name in ('move', 'first_child', 'n_children', 'visits', 'value'):
+            old = getattr(self, name)
+            new = np.full(capacity, -1, dtype=old.dtype) if name == 'first_child' else np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _expand(self, node, board):#add one child per empty cell, most central first
+        geo = geometry(int(round(len(board) ** 0.5)))
+        empty = np.flatnonzero(board == 0)
+        empty = empty[np.argsort(-geo.weights.ravel()[empty], kind='stable')]
+        self._grow(len(empty))
+        first = self.size
+        self.move[first:first + len(empty)] = empty
+        self.first_child[node] = first
+        self.n_children[node] = len(empty)
+        self.size += len(empty)
+
+    def _select_child(self, node):#first unvisited child, otherwise the best UCB1 score
+        first = self.first_child[node]
+        visits = self.visits[first:first + self.n_children[node]]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return first + unvisited[0]
+        ucb = self.value[first:first + len(visits)] / visits + self.exploration * np.sqrt(np.log(self.visits[node]) / visits)
+        return first + int(np.argmax(ucb))
+
+    def playouts(self, board, turn, count):#results of count random games finished from board, +1 = O wins, 0 = draw, -1 = X wins
+        geo = geometry(int(round(len(board) ** 0.5)))
+        empty = np.flatnonzero(board == 0)
+        #weighted random order of the empty cells (Gumbel keys), the side to move takes the even positions
+        keys = self.bias * np.log(geo.weights.ravel()[empty]) + self.rng.gumbel(size=(count, len(empty)))
+        order = empty[np.argsort(-keys, axis=1)]
+        boards = np.repeat(board[None, :], count, axis=0)
+        rows = np.arange(count)[:, None]
+        boards[rows, order[:, 0::2]] = turn
+        boards[rows, order[:, 1::2]] = -turn
+        cells = boards[:, geo.window_array]
+        O_triplets = (cells == 1).all(axis=2).sum(axis=1)
+        X_triplets = (cells == -1).all(axis=2).sum(axis=1)
+        return np.sign(O_triplets - X_triplets)
+
+    def _reroot(self, board, turn):#keep the subtree of the new root if it follows from the old one by at most two moves
+        if self.root_board is None or len(board) != len(self.root_board):
+            return False
+        added = np.flatnonzero(board != self.root_board)
+        if len(added) > 2 or (self.root_board[added] != 0).any() or (len(added) % 2 == 1) != (turn != self.root_turn):
+            return False
+        node = 0
+        mover = self.root_turn
+        for _ in range(len(added)):#follow the stone of each side in turn
+            cell = next((idx for idx in added if board[idx] == mover), None)
+            if cell is None or self.n_children[node] == 0:
+                return False
+            first = self.first_child[node]
+            children = np.flatnonzero(self.move[first:first + self.n_children[node]] == cell)
+            node = first + int(children[0])
+            mover = -mover
+        if node != 0:
+            self._compact(node)
+        return True
+
+    def _compact(self, root):#rebuild the pool with only the subtree of root, which becomes node 0
+        order = [root] #old ids in new order, children blocks stay contiguous
+        for old in order:
+            if self.n_children[old]:
+                first = self.first_child[old]
+                order.extend(range(first, first + self.n_children[old]))
+        order = np.array(order)
+        new_id = np.full(len(self.visits), -1, dtype=np.int32)
+        new_id[order] = np.arange(len(order))
+        has_children = self.n_children[order] > 0
+        self.move = self.move[order]
+        self.first_child = np.where(has_children, new_id[self.first_child[order]], -1).astype(np.int32)
+        self.n_children = self.n_children[order]
+        self.visits = self.visits[order]
+        self.value = self.value[order]
+        self.size = len(order)
+        self._grow(self.capacity)
+
+    def search(self, game_state: GameStatus, time_budget_ms=None, iterations=None, stats=None):
+        """
+        Run UCT iterations until time_budget_ms or iterations runs out (or a stats hook cancels the search) and return
+        (expected result for the side to move between 0 and 1, most visited move).
+        """
+        board = game_state.board_state.ravel().astype(np.int8)
+        turn = 1 if game_state.turn_O else -1
+        if not self._reroot(board, turn):
+            self._reset()
+        self.root_board, self.root_turn = board, turn
+        if not (board == 0).any():
+            return None, None
+        deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000.0
+        if iterations is None and deadline is None:
+            iterations = 1000
+        count = self.playouts_per_leaf
+        self.iterations = 0
+        self.max_depth = 0
+        try:
+            while (iterations is None or self.iterations < iterations) and (deadline is None or time.perf_counter() < deadline):
+                if stats is not None:
+                    stats.node(0)
+                #selection, replaying the moves on a scratch board
+                scratch = board.copy()
+                mover = turn
+                node = 0
+                path = [0]
+                while self.n_children[node]:
+                    node = self._select_child(node)
+                    scratch[self.move[node]] = mover
+                    mover = -mover
+                    path.append(node)
+                #expansion of a leaf seen before, unless the board is full
+                if self.visits[node] > 0 and (scratch == 0).any():
+                    self._expand(node, scratch)
+                    node = self._select_child(node)
+                    scratch[self.move[node]] = mover
+                    mover = -mover
+                    path.append(node)
+                #simulation
+                if stats is not None:
+                    started = time.perf_counter()
+                results = self.playouts(scratch, mover, count)
+                if stats is not None:
+                    stats.eval_time += time.perf_counter() - started
+                    stats.leaf_evaluations += count
+                #backpropagation, the node at depth d was entered by turn (d odd) or -turn (d even)
+                O_score = float((results + 1).sum()) / 2 #O wins count 1, draws 0.5
+                for depth, visited in enumerate(path):
+                    self.visits[visited] += count
+                    if depth:
+                        self.value[visited] += O_score if (turn == 1) == (depth % 2 == 1) else count - O_score
+                self.max_depth = max(self.max_depth, len(path) - 1)
+                self.iterations += 1
+        except SearchTimeout:#cancelled through a stats hook, answer with what the tree knows
+            pass
+
+        if self.n_children[0] == 0:
+            self._expand(0, board)
+            return 0.5, divmod(int(self.move[self.first_child[0]]), game_state.grid_size)
+        first = self.first_child[0]
+        visits = self.visits[first:first + self.n_children[0]]
+        best = first + int(np.argmax(visits))
+        win_rate = self.value[best] / self.visits[best] if self.visits[best] else 0.5
+        return float(win_rate), divmod(int(self.move[best]), game_state.grid_size)
+
+def mcts(game_state: GameStatus, time_budget_ms=None, iterations=None, tree=None, stats=None):#MCTS.search() with a fresh tree unless one is passed in
+    if tree is None:
+        tree = MCTS()
+    return tree.search(game_state, time_budget_ms, iterations, stats)
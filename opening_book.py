@@ -0,0 +1,141 @@
+#opening_book.py
+"""
+Precomputed AI moves, consulted before searching. 3x3 is solved exhaustively; for larger grids the book
+holds every position up to a few plies from the empty board, searched offline at a fixed depth.
+Positions are stored once per symmetry class (see GameStatus.canonical_key()). Build the book with
+
+    python opening_book.py --sizes 3 4 5 --output opening_book.bin
+"""
+import argparse
+import struct
+import sys
+import time
+import numpy as np
+from GameStatus_51202 import GameStatus
+from multiAgents2 import minimax
+from transposition import TranspositionTable
+
+BOOK_PATH = 'opening_book.bin'
+BOOK_PLAN = {4: (3, 5)} #grid size -> (plies from the empty board, search depth); other sizes use LARGE_BOARD_PLAN
+LARGE_BOARD_PLAN = (1, 3)
+
+MAGIC = b'TTTB'
+VERSION = 1
+HEADER = struct.Struct('<4sHI') #magic, version, record count
+RECORD = np.dtype([('key', '<u8'), ('size', 'u1'), ('move', 'u1'), ('score', '<i4')]) #14 bytes, sorted by (key, size)
+
+class OpeningBook:
+    """
+    Read-only view of a book file. The records are memory-mapped, so loading is instant and only the pages
+    touched by lookups are read from disk.
+    """
+    def __init__(self, records):
+        self.records = records
+        self.keys = records['key']
+        self.sizes = set(int(size) for size in np.unique(records['size'])) if len(records) else set()
+
+    @classmethod
+    def load(cls, path=BOOK_PATH):
+        with open(path, 'rb') as f:
+            magic, version, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+        if count == 0:
+            return cls(np.zeros(0, dtype=RECORD))
+        return cls(np.memmap(path, dtype=RECORD, mode='r', offset=HEADER.size, shape=(count,)))
+
+    def lookup(self, game_state):#return (score from O's point of view, move for the side to move), or None if the position is not in the book
+        size = game_state.grid_size
+        if size not in self.sizes:
+            return None
+        key, t = game_state.canonical_key()
+        idx = int(np.searchsorted(self.keys, key))
+        #hashes are per grid size, so the same key can be stored once for each size (e.g. 0 for every empty board)
+        while idx < len(self.keys) and self.keys[idx] == key and self.records[idx]['size'] != size:
+            idx += 1
+        if idx >= len(self.keys) or self.keys[idx] != key:
+            return None
+        record = self.records[idx]
+        move = game_state.from_canonical(divmod(int(record['move']), size), t) #back from the canonical orientation
+        return int(record['score']), move
+
+    def __len__(self):
+        return len(self.records)
+
+def write_book(entries, path=BOOK_PATH):#entries: {(size, canonical key): (canonical move index, score)}
+    records = np.zeros(len(entries), dtype=RECORD)
+    for i, ((size, key), (move, score)) in enumerate(sorted(entries.items(), key=lambda item: (item[0][1], item[0][0]))):
+        records[i] = (key, size, move, score)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        f.write(records.tobytes())
+
+def _add_entry(entries, state, move, score):#store move in the canonical orientation of state
+    size = state.grid_size
+    key, t = state.canonical_key()
+    if (size, key) not in entries:
+        x, y = state.to_canonical(move, t)
+        entries[size, key] = (x * size + y, int(score))
+
+def solve_3x3(entries):#exhaustive minimax over every reachable 3x3 position, either side moving first
+    memo = {}
+
+    def solve(state):
+        key = (state.board_state.tobytes(), state.turn_O)
+        if key in memo:
+            return memo[key]
+        if state.is_terminal():
+            memo[key] = state.get_scores()
+            return memo[key]
+        best_score, best_move = None, None
+        for move in state.get_moves():
+            score = solve(state.get_new_state(move))
+            if best_score is None or (score > best_score if state.turn_O else score < best_score):
+                best_score, best_move = score, move
+        memo[key] = best_score
+        _add_entry(entries, state, best_move, best_score)
+        return best_score
+
+    for turn_O in (True, False):
+        solve(GameStatus(np.zeros((3, 3), dtype=int), turn_O))
+
+def build_openings(entries, size, plies, depth):#search every position up to plies moves in, either side moving first
+    tt = TranspositionTable()
+    seen = set()
+    frontier = [GameStatus(np.zeros((size, size), dtype=int), turn_O) for turn_O in (True, False)]
+    for ply in range(plies + 1):
+        next_frontier = []
+        for state in frontier:
+            key, _ = state.canonical_key()
+            if key in seen or state.is_terminal():
+                continue
+            seen.add(key)
+            score, move = minimax(state, depth, state.turn_O, tt=tt)
+            _add_entry(entries, state, move, score)
+            if ply < plies:
+                next_frontier.extend(state.get_new_state(m) for m in state.get_moves())
+        frontier = next_frontier
+        print(f"{size}x{size} ply {ply}: {len(seen)} positions", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the opening book used by the AI.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(range(3, 11)), help='grid sizes to include, 3x3 is always solved exhaustively')
+    parser.add_argument('--plies', type=int, default=None, help='book depth in moves from the empty board for grids larger than 3x3 (default: BOOK_PLAN)')
+    parser.add_argument('--depth', type=int, default=None, help='search depth used for each book position (default: BOOK_PLAN)')
+    parser.add_argument('--output', default=BOOK_PATH)
+    args = parser.parse_args(argv)
+
+    entries = {}
+    started = time.perf_counter()
+    for size in args.sizes:
+        if size == 3:
+            solve_3x3(entries)
+            print(f"3x3 solved: {len(entries)} positions", file=sys.stderr)
+        else:
+            plies, depth = BOOK_PLAN.get(size, LARGE_BOARD_PLAN)
+            build_openings(entries, size, plies if args.plies is None else args.plies, depth if args.depth is None else args.depth)
+    write_book(entries, args.output)
+    print(f"Wrote {len(entries)} positions to {args.output} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
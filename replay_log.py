@@ -0,0 +1,232 @@
+#replay_log.py
+"""
+Replay logged games and compare the current AI with the moves the AI played at the time, e.g.
+
+    python replay_log.py game_log.txt --depth 3 --workers 4 --output replay.json
+
+Reads the Markdown log (game_log.txt) as well as JSON Lines records (game_log.jsonl), one line at a time.
+"""
+import argparse
+import itertools
+import json
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from GameStatus_51202 import GameStatus
+from benchmark import latency_summary
+from multiAgents2 import minimax, negamax, pvs, iterative_deepening
+from opening_book import OpeningBook, BOOK_PATH
+from transposition import TranspositionTable
+
+HEADER_RE = re.compile(r"## New Game Started: (\d+)x\d+ Grid, Mode: (.*), Algorithm: (\w+)")
+MOVE_RE = re.compile(r"(Player|AI) '([OX])' placed at position \((\d+), (\d+)\)")
+SCORE_RE = re.compile(r"AI evaluated move with score: (-?\d+)")
+GAME_OVER_RE = re.compile(r"Game over: (?:(O|X)!|It's a (draw)!)")
+BOARD_ROW_RE = re.compile(r"^[.OX]( [.OX])*$")
+
+class LoggedGame:
+    """
+    One game read from a log: moves is a list of (symbol, 'player' or 'ai', (row, col), logged score or None).
+    """
+    def __init__(self, size, mode=None, algorithm=None):
+        self.size = size
+        self.mode = mode
+        self.algorithm = algorithm
+        self.moves = []
+        self.winner = None #None if the log ends before the game does
+
+    def positions(self):#yield (GameStatus before the move, symbol, by, move, logged score) for every logged move
+        if not self.moves:
+            return
+        state = GameStatus(np.zeros((self.size, self.size), dtype=int), self.moves[0][0] == 'O')
+        for symbol, by, move, score in self.moves:
+            if state.board_state[move] != 0 or (symbol == 'O') != state.turn_O:
+                return #inconsistent log, stop replaying this game here
+            yield state, symbol, by, move, score
+            state = state.get_new_state(move)
+
+def _parse_markdown(lines):#games from the Markdown log, lines already stripped
+    game = None
+    for line in lines:
+        header = HEADER_RE.match(line)
+        if header:
+            if game is not None and game.moves:
+                yield game
+            game = LoggedGame(int(header.group(1)), header.group(2), header.group(3).lower())
+            continue
+        if BOARD_ROW_RE.match(line):#board dumps are redundant with the moves, but give the grid size of games without a header
+            if game is not None and game.size is None:
+                game.size = len(line.split())
+            continue
+        move = MOVE_RE.match(line)
+        if move:
+            if game is None:
+                game = LoggedGame(None)
+            game.moves.append((move.group(2), move.group(1).lower(), (int(move.group(3)), int(move.group(4))), None))
+            continue
+        score = SCORE_RE.match(line)
+        if score and game is not None and game.moves:
+            symbol, by, cell, _ = game.moves[-1]
+            game.moves[-1] = (symbol, by, cell, int(score.group(1)))
+            continue
+        over = GAME_OVER_RE.match(line)
+        if over and game is not None:
+            game.winner = over.group(1) or 'Draw'
+            if game.moves:
+                yield game
+            game = None
+    if game is not None and game.moves:
+        yield game
+
+def _parse_json_lines(records):#games from game_log.jsonl records (see game_log.py)
+    games = {}
+    for record in records:
+        event = record.get('event')
+        if event == 'game_start':
+            games[record['game']] = LoggedGame(record['size'], record.get('mode'), record.get('algorithm'))
+        elif event == 'move' and record.get('game') in games:
+            games[record['game']].moves.append((record['symbol'], record['by'], tuple(record['move']), record.get('score')))
+        elif event in ('game_over', 'game_abandoned') and record.get('game') in games:
+            game = games.pop(record['game'])
+            game.winner = record.get('winner')
+            if game.moves:
+                yield game
+    for game in games.values():#log ended mid-game
+        if game.moves:
+            yield game
+
+def iter_games(path):#yield every LoggedGame in a log file, reading it line by line
+    with open(path, encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        first = next(lines, '')
+        lines = itertools.chain([first], lines)
+        if first.startswith('{'):
+            yield from _parse_json_lines(json.loads(line) for line in lines if line)
+        else:
+            yield from (game for game in _parse_markdown(lines) if game.size is not None)
+
+def iter_positions(games, include_player_moves=False):#yield (game index, ply, GameStatus, logged move, logged score) to re-search
+    for index, game in enumerate(games):
+        for ply, (state, symbol, by, move, score) in enumerate(game.positions()):
+            if (by == 'ai' or include_player_moves) and not state.is_terminal():
+                yield index, ply, state, move, score
+
+_book = None #opening book of a worker process, loaded on first use
+
+def analyze_position(state, logged_move, algorithm='negamax', depth=3, time_budget_ms=None, use_book=True, frontier_radius=None, max_moves=None):
+    """
+    Choose a move for state with the current AI and compare it with logged_move.
+    Returns (agrees, AI move, AI score, search time in ms); moves that lead to symmetric positions count as the same.
+    """
+    global _book
+    if use_book and _book is None:
+        try:
+            _book = OpeningBook.load(BOOK_PATH)
+        except OSError:
+            _book = False
+    if state.grid_size >= 7 and (frontier_radius is not None or max_moves is not None):
+        state.set_move_generation(frontier_radius, max_moves)
+    started = time.perf_counter()
+    entry = _book.lookup(state) if use_book and _book else None
+    if entry is not None:
+        score, move = entry
+    elif time_budget_ms is not None:
+        score, move, _ = iterative_deepening(state, time_budget_ms, algorithm)
+    elif algorithm == 'minimax':
+        score, move = minimax(state, depth, state.turn_O, tt=TranspositionTable())
+    else:
+        search = pvs if algorithm == 'pvs' else negamax
+        score, move = search(state, depth, 1 if state.turn_O else -1, tt=TranspositionTable())
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    move = (int(move[0]), int(move[1]))
+    agrees = state.get_new_state(move).canonical_key()[0] == state.get_new_state(logged_move).canonical_key()[0]
+    return agrees, move, score, elapsed_ms
+
+def _analyze_task(task):#pool worker entry point
+    (game, ply, state, logged_move, logged_score), options = task
+    agrees, move, score, elapsed_ms = analyze_position(state, logged_move, **options)
+    return {
+        'game': game,
+        'ply': ply,
+        'size': state.grid_size,
+        'logged_move': list(logged_move),
+        'logged_score': logged_score,
+        'move': list(move),
+        'score': None if score is None else int(score),
+        'agrees': agrees,
+        'time_ms': round(elapsed_ms, 3),
+    }
+
+def replay(path, workers=1, batch_size=64, include_player_moves=False, limit=None, **options):
+    """
+    Re-search the logged positions of path (in batches over a process pool when workers > 1) and return a
+    JSON-serializable report with the disagreement rate and search times, overall and per grid size.
+    options are passed to analyze_position().
+    """
+    positions = iter_positions(iter_games(path), include_player_moves)
+    if limit is not None:
+        positions = itertools.islice(positions, limit)
+    tasks = ((position, options) for position in positions)
+
+    results = []
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            batch = list(itertools.islice(tasks, batch_size))
+            if not batch:
+                break
+            results.extend(pool.map(_analyze_task, batch) if pool else map(_analyze_task, batch))
+            print(f"{len(results)} positions analyzed", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    def summary(rows):
+        disagreements = sum(1 for row in rows if not row['agrees'])
+        return {
+            'positions': len(rows),
+            'disagreements': disagreements,
+            'disagreement_rate': disagreements / len(rows) if rows else None,
+            'latency': latency_summary([row['time_ms'] for row in rows]),
+        }
+
+    sizes = sorted(set(row['size'] for row in results))
+    return {
+        'log': path,
+        'options': options,
+        'overall': summary(results),
+        'by_size': {size: summary([row for row in results if row['size'] == size]) for size in sizes},
+        'positions': results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Re-run the current AI on logged games and report where it disagrees.')
+    parser.add_argument('log', nargs='?', default='game_log.txt', help='game_log.txt (Markdown) or game_log.jsonl')
+    parser.add_argument('--algorithm', default='negamax', choices=['minimax', 'negamax', 'pvs'])
+    parser.add_argument('--depth', type=int, default=3, help='fixed search depth')
+    parser.add_argument('--budget-ms', type=int, default=None, help='use iterative deepening with this per-move budget instead of a fixed depth')
+    parser.add_argument('--no-book', action='store_true', help='always search, never play from the opening book')
+    parser.add_argument('--frontier-radius', type=int, default=None, help='on 7x7 and larger grids, only consider cells this close to a stone')
+    parser.add_argument('--max-moves', type=int, default=None, help='on 7x7 and larger grids, only search this many best-ordered moves')
+    parser.add_argument('--all-moves', action='store_true', help='also re-search the positions where the player moved')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--limit', type=int, default=None, help='stop after this many positions')
+    parser.add_argument('--output', default=None, help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    report = replay(args.log, args.workers, include_player_moves=args.all_moves, limit=args.limit,
+                    algorithm=args.algorithm, depth=args.depth, time_budget_ms=args.budget_ms, use_book=not args.no_book,
+                    frontier_radius=args.frontier_radius, max_moves=args.max_moves)
+    overall = report['overall']
+    print(f"{overall['disagreements']}/{overall['positions']} positions disagree", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#search_stats.py
+import time
+
+class SearchStats:
+    """
+    Counters filled in by minimax()/negamax() when passed as stats=, one instance per AI move or per game.
+    Searches without stats pay nothing; with stats each node costs a few integer updates.
+
+    Hooks are callables hook(event, stats) called with 'start' and 'stop' around a search and with 'sample'
+    every sample_every nodes, e.g. to drive a sampling profiler (see profiler_hook()).
+    """
+    def __init__(self, hooks=None, sample_every=10000):
+        self.nodes = 0 #positions visited
+        self.leaf_evaluations = 0 #terminal or depth-limit positions scored with get_scores()
+        self.cutoffs = 0 #alpha-beta prunes
+        self.cutoffs_by_index = [] #cutoffs_by_index[i] = prunes caused by the i-th move searched at a node
+        self.min_depth_left = None #smallest remaining depth seen, with max_depth_left gives the deepest ply
+        self.max_depth_left = None
+        self.move_gen_time = 0.0 #seconds inside get_moves()
+        self.eval_time = 0.0 #seconds inside get_scores() at leaves
+        self.search_time = 0.0 #seconds between start() and stop()
+        self.hooks = list(hooks) if hooks else []
+        self.sample_every = sample_every
+        self._next_sample = sample_every
+        self._started = None
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def _fire(self, event):
+        for hook in self.hooks:
+            hook(event, self)
+
+    def start(self):#mark the start of a search
+        self._started = time.perf_counter()
+        self._fire('start')
+
+    def stop(self):#mark the end of a search
+        if self._started is not None:
+            self.search_time += time.perf_counter() - self._started
+            self._started = None
+        self._fire('stop')
+
+    def node(self, depth):#called once per visited position with its remaining depth
+        self.nodes += 1
+        if self.min_depth_left is None or depth < self.min_depth_left:
+            self.min_depth_left = depth
+        if self.max_depth_left is None or depth > self.max_depth_left:
+            self.max_depth_left = depth
+        if self.nodes >= self._next_sample:
+            self._next_sample += self.sample_every
+            self._fire('sample')
+
+    def cutoff(self, move_index):#called when the move_index-th child of a node prunes its siblings
+        self.cutoffs += 1
+        while len(self.cutoffs_by_index) <= move_index:
+            self.cutoffs_by_index.append(0)
+        self.cutoffs_by_index[move_index] += 1
+
+    @property
+    def max_ply(self):#deepest ply reached below the root
+        if self.max_depth_left is None:
+            return 0
+        return self.max_depth_left - self.min_depth_left
+
+    def merge(self, other):#add another SearchStats' counters to this one (e.g. from a worker process)
+        self.nodes += other.nodes
+        self.leaf_evaluations += other.leaf_evaluations
+        self.cutoffs += other.cutoffs
+        for i, count in enumerate(other.cutoffs_by_index):
+            if i < len(self.cutoffs_by_index):
+                self.cutoffs_by_index[i] += count
+            else:
+                self.cutoffs_by_index.append(count)
+        for depth in (other.min_depth_left, other.max_depth_left):
+            if depth is not None:
+                if self.min_depth_left is None or depth < self.min_depth_left:
+                    self.min_depth_left = depth
+                if self.max_depth_left is None or depth > self.max_depth_left:
+                    self.max_depth_left = depth
+        self.move_gen_time += other.move_gen_time
+        self.eval_time += other.eval_time
+
+    def __getstate__(self):#hooks stay in the process that registered them
+        state = self.__dict__.copy()
+        state['hooks'] = []
+        return state
+
+    def as_dict(self):
+        return {
+            'nodes': self.nodes,
+            'leaf_evaluations': self.leaf_evaluations,
+            'cutoffs': self.cutoffs,
+            'cutoffs_by_index': list(self.cutoffs_by_index),
+            'max_ply': self.max_ply,
+            'move_gen_time_s': round(self.move_gen_time, 6),
+            'eval_time_s': round(self.eval_time, 6),
+            'search_time_s': round(self.search_time, 6),
+        }
+
+def profiler_hook(profiler):#hook that runs a cProfile.Profile (or anything with enable/disable) only while searching
+    def hook(event, stats):
+        if event == 'start':
+            profiler.enable()
+        elif event == 'stop':
+            profiler.disable()
+    return hook
@@ -0,0 +1,95 @@
+#test_incremental_state.py
+"""
+The evaluation, triplet counts, threat index and hashes are all updated move by move instead of recomputed.
+Play random games and compare them with a full rescan of the board after every move, for both board backends
+and for both get_new_state() and make_move()/unmake_move(). Run with python -m pytest.
+"""
+import random
+import numpy as np
+import pytest
+from GameStatus_51202 import GameStatus
+from bitboard_status import BitboardGameStatus
+from board_geometry import compute_weights
+from transposition import hash_board
+
+def brute_windows(size):#every triplet window as three (row, col) cells, enumerated independently of BoardGeometry
+    windows = []
+    for r in range(size):
+        for c in range(size):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                cells = [(r + k * dr, c + k * dc) for k in range(3)]
+                if all(0 <= x < size and 0 <= y < size for x, y in cells):
+                    windows.append(cells)
+    return windows
+
+def brute_force(board, turn_O):#(evaluation, O triplets, X triplets, threat cells, threat making cells) from scratch, cells per symbol
+    size = board.shape[0]
+    weights = compute_weights(size)
+    score = 0
+    triplets = {1: 0, -1: 0}
+    threats = {1: set(), -1: set()}
+    threat_making = {1: set(), -1: set()}
+    for cells in brute_windows(size):
+        values = [board[cell] for cell in cells]
+        for symbol in (1, -1):
+            count = values.count(symbol)
+            if count and not values.count(-symbol):
+                weight = sum(int(weights[cell]) for cell, value in zip(cells, values) if value == symbol)
+                score += symbol * (weight ** 2 + (weight * 10 if count == 2 else 0))
+            if count == 3:
+                triplets[symbol] += 1
+            if count == 2 and values.count(0) == 1:
+                threats[symbol].add(cells[values.index(0)][0] * size + cells[values.index(0)][1])
+            if count == 1 and values.count(0) == 2:
+                threat_making[symbol].update(x * size + y for (x, y), value in zip(cells, values) if value == 0)
+    return score, triplets[1], triplets[-1], {s: sorted(threats[s]) for s in threats}, {s: sorted(threat_making[s]) for s in threat_making}
+
+def brute_symmetry_hashes(board, turn_O):
+    transforms = [np.rot90(board, k) for k in range(4)] + [np.rot90(board.T, k) for k in range(4)]
+    return tuple(hash_board(np.ascontiguousarray(t), turn_O) for t in transforms)
+
+def check(state):
+    board = np.array(state.board_state)
+    score, O_triplets, X_triplets, threats, threat_making = brute_force(board, state.turn_O)
+    assert state.evaluate_board() == score
+    assert (state.count_triplets(1), state.count_triplets(-1)) == (O_triplets, X_triplets)
+    for symbol in (1, -1):
+        assert state.threat_cells(symbol) == threats[symbol]
+        assert state.threat_making_cells(symbol) == threat_making[symbol]
+    assert state.empty_count == int(np.count_nonzero(board == 0))
+    assert state.zobrist_hash == hash_board(board, state.turn_O)
+    assert state.symmetry_hashes == brute_symmetry_hashes(board, state.turn_O)
+
+def new_state(backend, size, turn_O):
+    board = np.zeros((size, size), dtype=int)
+    state = GameStatus(board, turn_O) if backend == 'numpy' else BitboardGameStatus.from_array(board, turn_O)
+    state.evaluate_board() #build the cached evaluation and hashes first, so every later value is an update
+    state.symmetry_hashes
+    return state
+
+@pytest.mark.parametrize('backend', ['numpy', 'bitboard'])
+@pytest.mark.parametrize('size', range(3, 11))
+def test_get_new_state_matches_rescan(backend, size):
+    rng = random.Random(size)
+    for game in range(2):
+        state = new_state(backend, size, game == 0)
+        check(state)
+        while state.empty_count and not (size == 3 and state.is_terminal()):
+            state = state.get_new_state(rng.choice(state.get_moves()))
+            check(state)
+
+@pytest.mark.parametrize('backend', ['numpy', 'bitboard'])
+@pytest.mark.parametrize('size', range(3, 11))
+def test_make_unmake_matches_rescan(backend, size):
+    rng = random.Random(100 + size)
+    state = new_state(backend, size, True)
+    played = []
+    while state.empty_count and not (size == 3 and state.is_terminal()):
+        move = rng.choice(state.get_moves())
+        state.make_move(move)
+        played.append(move)
+        check(state)
+    for move in reversed(played):
+        state.unmake_move(move)
+        check(state)
+    assert state.empty_count == size * size
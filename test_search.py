@@ -0,0 +1,89 @@
+#test_search.py
+"""
+Checks for the search code paths that the incremental state test does not reach: the parallel search and the
+game states sent to its workers, move ordering state carried over from another search, cancelled searches
+and the threat extension. Run with python -m pytest.
+"""
+import pickle
+import random
+import threading
+import numpy as np
+import pytest
+from GameStatus_51202 import GameStatus
+from bitboard_status import BitboardGameStatus
+from move_ordering import MoveOrdering
+import multiAgents2
+from multiAgents2 import _staged_moves, cancel_hook, iterative_deepening, minimax, negamax, parallel_root_search, shutdown_process_pool, threat_search
+from search_stats import SearchStats
+
+def random_state(backend, size, stones, seed, frontier=False):#game state after stones random moves
+    board = np.zeros((size, size), dtype=int)
+    state = GameStatus(board, True) if backend == 'numpy' else BitboardGameStatus.from_array(board, True)
+    if frontier:
+        state.set_move_generation(1, 8)
+    rng = random.Random(seed)
+    for _ in range(stones):
+        state.make_move(rng.choice(state.get_moves()))
+    return state
+
+@pytest.mark.parametrize('backend', ['numpy', 'bitboard'])
+@pytest.mark.parametrize('frontier', [False, True])
+def test_pickle_round_trip(backend, frontier):
+    state = random_state(backend, 6, 7, 1, frontier)
+    state.symmetry_hashes
+    copy = pickle.loads(pickle.dumps(state))
+    assert type(copy) is type(state)
+    assert (np.array(copy.board_state) == np.array(state.board_state)).all()
+    assert copy.turn_O == state.turn_O
+    assert copy.zobrist_hash == state.zobrist_hash
+    assert copy.symmetry_hashes == state.symmetry_hashes
+    assert copy.evaluate_board() == state.evaluate_board()
+    assert copy.get_moves() == state.get_moves()
+    move = copy.get_moves()[0]
+    assert copy.get_new_state(move).zobrist_hash == state.get_new_state(move).zobrist_hash
+
+@pytest.mark.parametrize('backend', ['numpy', 'bitboard'])
+def test_killers_from_a_larger_board_are_skipped(backend):
+    ordering = MoveOrdering()
+    ordering.cutoff((5, 1), 1, True, 2) #e.g. left over from a 7x7 game
+    ordering.cutoff((1, 5), 1, True, 2)
+    state = random_state(backend, 4, 3, 2)
+    moves = list(_staged_moves(state, None, None, ordering, 1))
+    assert sorted(moves) == sorted(state.get_moves())
+
+@pytest.mark.parametrize('algorithm', ['minimax', 'negamax', 'pvs'])
+def test_cancelled_depth_one_still_returns_a_move(algorithm):
+    cancel = threading.Event()
+    cancel.set() #e.g. the ponder-hit timer fired before depth 1 finished
+    stats = SearchStats(hooks=[cancel_hook(cancel)], sample_every=1)
+    state = random_state('numpy', 7, 4, 3)
+    score, move, depth = iterative_deepening(state, 1000, algorithm, stats=stats)
+    assert depth == 0 and move in state.get_moves()
+
+@pytest.mark.parametrize('algorithm', ['negamax', 'minimax'])
+def test_parallel_matches_sequential(algorithm):
+    shutdown_process_pool() #fresh worker tables, so both searches see the same depth-limited values
+    try:
+        for size, depth in ((3, 4), (4, 3), (5, 3), (6, 2), (7, 2)):
+            for seed in range(2):
+                state = random_state('numpy', size, 2 + seed, seed)
+                if algorithm == 'negamax':
+                    expected = negamax(state, depth, 1 if state.turn_O else -1)
+                else:
+                    expected = minimax(state, depth, state.turn_O)
+                assert parallel_root_search(state, depth, algorithm, workers=2) == expected
+    finally:
+        shutdown_process_pool()
+
+@pytest.mark.parametrize('backend', ['numpy', 'bitboard'])
+def test_threat_search_finds_forced_triplet(backend, monkeypatch):
+    #O to move wins by force: threat, block, double threat, block, triplet
+    board = np.array([[0, 0, 0], [0, 0, 0], [0, -1, 1]])
+    state = GameStatus(board.copy(), True) if backend == 'numpy' else BitboardGameStatus.from_array(board, True)
+    assert negamax(state.copy(), 9, 1)[0] == 1000
+    assert threat_search(state, 1, plies=3) < 1000 #too short for the whole sequence
+    assert threat_search(state, 1, plies=5) == 1000
+    assert (np.array(state.board_state) == board).all()
+    assert negamax(state, 1, 1)[0] < 1000
+    monkeypatch.setattr(multiAgents2, 'THREAT_EXTENSION_PLIES', 4)
+    assert negamax(state, 1, 1)[0] == 1000
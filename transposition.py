@@ -0,0 +1,98 @@
+#transposition.py
+import random
+
+EXACT = 0 #stored value is the exact minimax value
+LOWER = 1 #stored value is a lower bound (search failed high)
+UPPER = 2 #stored value is an upper bound (search failed low)
+
+_zobrist_cache = {}#per-size zobrist keys, built on first use
+
+def zobrist_keys(size):#return (per-cell keys for O and X, side-to-move key) for a grid size
+    if size in _zobrist_cache:
+        return _zobrist_cache[size]
+    rng = random.Random(51202 + size) #fixed seed so hashes match across processes and runs
+    cell_keys = [(rng.getrandbits(64), rng.getrandbits(64)) for _ in range(size * size)]
+    side_key = rng.getrandbits(64)
+    _zobrist_cache[size] = (cell_keys, side_key)
+    return _zobrist_cache[size]
+
+def piece_key(size, move, symbol):#key to xor in/out when symbol (1 = O, -1 = X) is placed at move
+    cell_keys, side_key = zobrist_keys(size)
+    x, y = move
+    return cell_keys[x * size + y][0 if symbol == 1 else 1] ^ side_key
+
+def hash_board(board_state, turn_O):#full zobrist hash of a NumPy board
+    size = board_state.shape[0]
+    cell_keys, side_key = zobrist_keys(size)
+    h = 0
+    for idx, cell in enumerate(board_state.ravel()):
+        if cell == 1:
+            h ^= cell_keys[idx][0]
+        elif cell == -1:
+            h ^= cell_keys[idx][1]
+    if not turn_O:
+        h ^= side_key
+    return h
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by zobrist hash.
+    Each bucket has a depth-preferred slot and an always-replace slot; entries are (key, depth, flag, value, move).
+    """
+    ENTRY_BYTES = 160 #rough size of one stored entry tuple, used to turn the memory cap into a bucket count
+
+    def __init__(self, max_mb=16):
+        n_buckets = max(1, int(max_mb * 1024 * 1024) // (2 * self.ENTRY_BYTES))
+        n_buckets = 1 << (n_buckets.bit_length() - 1) #round down to a power of two so indexing is a mask
+        self.mask = n_buckets - 1
+        self.depth_slots = [None] * n_buckets
+        self.always_slots = [None] * n_buckets
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def probe(self, key):#return the stored entry for key, or None
+        idx = key & self.mask
+        entry = self.depth_slots[idx]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        other = self.always_slots[idx]
+        if other is not None and other[0] == key:
+            self.hits += 1
+            return other
+        if entry is not None or other is not None:
+            self.collisions += 1 #bucket in use by a different position
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        idx = key & self.mask
+        entry = (key, depth, flag, value, move)
+        current = self.depth_slots[idx]
+        if current is None or current[0] == key:
+            self.depth_slots[idx] = entry
+        elif depth >= current[1]:
+            self.always_slots[idx] = current #demote the shallower entry instead of dropping it
+            self.depth_slots[idx] = entry
+        else:
+            self.always_slots[idx] = entry
+        self.stores += 1
+
+    def clear(self):
+        n_buckets = self.mask + 1
+        self.depth_slots = [None] * n_buckets
+        self.always_slots = [None] * n_buckets
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def stats(self):#counters for sizing the table
+        filled = sum(1 for e in self.depth_slots if e is not None) + sum(1 for e in self.always_slots if e is not None)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'filled': filled,
+            'capacity': 2 * (self.mask + 1),
+        }